@@ -0,0 +1,125 @@
+"""Measure ModelTrainer data-parallel scaling (samples/sec) across local processes.
+
+Each run launches ``torchrun --standalone`` with the given number of processes,
+splits the machine's cores evenly between them and trains a small randomly
+initialised BERT for one epoch, so nothing is downloaded.
+
+Usage:
+    python -m benchmarks.distributed_training --processes 1 2 4 8 --num-samples 4096
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader, Dataset
+from transformers import BertConfig, BertModel
+from src.model.trainer import ModelTrainer
+
+class TinyClassifier(nn.Module):
+    """Same interface as TransformerClassifier, built from a config instead of pretrained weights"""
+
+    def __init__(self, num_classes: int, hidden_size: int = 128, num_layers: int = 2):
+        super().__init__()
+        config = BertConfig(
+            vocab_size=30522,
+            hidden_size=hidden_size,
+            num_hidden_layers=num_layers,
+            num_attention_heads=2,
+            intermediate_size=hidden_size * 4
+        )
+        self.transformer = BertModel(config)
+        self.classifier = nn.Linear(hidden_size, num_classes)
+
+    def forward(self, input_ids, attention_mask=None):
+        outputs = self.transformer(input_ids=input_ids, attention_mask=attention_mask)
+        return self.classifier(outputs.last_hidden_state[:, 0, :])
+
+    def save(self, path: str):
+        torch.save(self.state_dict(), path)
+
+class RandomTokens(Dataset):
+    def __init__(self, num_samples: int, seq_length: int, num_classes: int, seed: int = 42):
+        generator = torch.Generator().manual_seed(seed)
+        self.input_ids = torch.randint(1000, 30000, (num_samples, seq_length), generator=generator)
+        self.labels = torch.randint(0, num_classes, (num_samples,), generator=generator)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __getitem__(self, idx: int):
+        return {
+            'input_ids': self.input_ids[idx],
+            'attention_mask': torch.ones_like(self.input_ids[idx]),
+            'labels': self.labels[idx]
+        }
+
+def worker(args):
+    """Entry point for each torchrun process"""
+    torch.manual_seed(0)
+    torch.set_num_threads(args.threads)
+    trainer = ModelTrainer(TinyClassifier(args.num_classes), device="cpu", distributed=True)
+    train_loader = DataLoader(RandomTokens(args.num_samples, args.seq_length, args.num_classes), batch_size=args.batch_size)
+    val_loader = DataLoader(RandomTokens(args.num_samples // 4, args.seq_length, args.num_classes, seed=7), batch_size=args.batch_size)
+
+    # Checkpoints land in a scratch directory so the benchmark leaves no files behind
+    os.chdir(args.workdir)
+    result = trainer.train(train_loader, val_loader, epochs=1, warmup_steps=0, progress=False)
+    if trainer.is_main_process:
+        with open(args.output, 'w') as f:
+            json.dump(result['training_history'][-1], f)
+    torch.distributed.destroy_process_group()
+
+def run(processes: int, args) -> dict:
+    threads = max(1, args.cores // processes)
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "result.json")
+        command = [
+            sys.executable, "-m", "torch.distributed.run", "--standalone", f"--nproc_per_node={processes}",
+            "-m", "benchmarks.distributed_training", "--worker",
+            "--output", output, "--workdir", tmp, "--threads", str(threads),
+            "--num-samples", str(args.num_samples), "--seq-length", str(args.seq_length),
+            "--batch-size", str(args.batch_size), "--num-classes", str(args.num_classes)
+        ]
+        subprocess.run(command, check=True, env={**os.environ, 'OMP_NUM_THREADS': str(threads)})
+        with open(output, 'r') as f:
+            metrics = json.load(f)
+    return {
+        'processes': processes,
+        'threads_per_process': threads,
+        'train_seconds': metrics['train_seconds'],
+        'samples_per_sec': metrics['samples_per_sec'],
+        'tokens_per_sec': metrics['tokens_per_sec']
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--cores", type=int, default=os.cpu_count())
+    parser.add_argument("--num-samples", type=int, default=4096)
+    parser.add_argument("--seq-length", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--num-classes", type=int, default=5)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--threads", type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    results = [run(processes, args) for processes in args.processes]
+    baseline = results[0]['samples_per_sec']
+    for result in results:
+        result['speedup'] = result['samples_per_sec'] / baseline
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
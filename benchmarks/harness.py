@@ -0,0 +1,185 @@
+"""Shared pieces of the benchmark suite: a tiny offline model, timing summaries and baseline comparison.
+
+Results files have the shape ``{"suite", "environment", "results": {name: {metric: value}}}``.
+Metrics ending in ``_per_sec`` are better when higher, metrics ending in
+``_ms`` are better when lower; other values are reported but not compared.
+
+Usage:
+    python -m benchmarks.harness compare results.json benchmarks/baselines/micro.json --tolerance 0.1
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from typing import Dict, Any, List, Callable, Optional, Tuple
+import numpy as np
+import torch
+
+# Vocabulary of the tiny tokenizer: special tokens, the words of the synthetic
+# corpus, and single letters so that any cleaned text still tokenizes
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+
+def build_tiny_model(directory: str,
+                     words: List[str],
+                     num_classes: int = 5,
+                     hidden_size: int = 64,
+                     num_layers: int = 2,
+                     max_position_embeddings: int = 512,
+                     seed: int = 0) -> Tuple[str, str]:
+    """Write a randomly initialised BERT checkpoint and matching tokenizer to directory.
+
+    Returns ``(model_path, model_name)`` for Predictor; model_name is the
+    directory itself, so AutoConfig and AutoTokenizer load it without a download.
+    """
+    from transformers import BertConfig, BertTokenizerFast
+    from src.model.architecture import TransformerClassifier
+
+    os.makedirs(directory, exist_ok=True)
+    vocab = SPECIAL_TOKENS + sorted(set(words)) + [chr(c) for c in range(ord('a'), ord('z') + 1)]
+    vocab += [f"##{chr(c)}" for c in range(ord('a'), ord('z') + 1)]
+    vocab_file = os.path.join(directory, "vocab.txt")
+    with open(vocab_file, 'w') as f:
+        f.write("\n".join(vocab) + "\n")
+    # Loading from the directory works with both the v4 (vocab_file) and v5 (vocab) constructors
+    BertTokenizerFast.from_pretrained(directory, do_lower_case=True).save_pretrained(directory)
+
+    config = BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=hidden_size,
+        num_hidden_layers=num_layers,
+        num_attention_heads=2,
+        intermediate_size=hidden_size * 4,
+        max_position_embeddings=max_position_embeddings
+    )
+    config.save_pretrained(directory)
+
+    torch.manual_seed(seed)
+    model = TransformerClassifier(directory, num_classes, pretrained=False, config=config)
+    model_path = os.path.join(directory, "model.safetensors")
+    model.save(model_path)
+    return model_path, directory
+
+def environment() -> Dict[str, Any]:
+    """Where the numbers came from, so baselines from different machines are not mistaken for regressions"""
+    return {
+        'python': platform.python_version(),
+        'torch': torch.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'torch_threads': torch.get_num_threads(),
+        'cuda': torch.cuda.get_device_name(0) if torch.cuda.is_available() else None,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    """Percentiles of per-call latencies, in milliseconds"""
+    ms = np.asarray(seconds) * 1000
+    return {
+        'mean_ms': float(ms.mean()),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99))
+    }
+
+def median(values: List[float]) -> float:
+    return float(np.median(values))
+
+def time_calls(fn: Callable[[], Any], repeats: int = 10, warmup: int = 2) -> List[float]:
+    """Wall-clock seconds of repeated calls after a warm-up"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def _direction(metric: str) -> Optional[int]:
+    if metric.endswith("_per_sec"):
+        return 1
+    if metric.endswith("_ms"):
+        return -1
+    return None
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.1) -> Dict[str, Any]:
+    """Relative change of every comparable metric against the baseline, flagging regressions beyond tolerance"""
+    changes = []
+    for name, metrics in results['results'].items():
+        reference = baseline['results'].get(name)
+        if not isinstance(metrics, dict) or not isinstance(reference, dict):
+            continue
+        for metric, value in metrics.items():
+            direction = _direction(metric)
+            old = reference.get(metric)
+            if direction is None or not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or old == 0:
+                continue
+            change = (value - old) / old
+            changes.append({
+                'benchmark': name,
+                'metric': metric,
+                'baseline': old,
+                'current': value,
+                'change': change,
+                'regression': change * direction < -tolerance
+            })
+    return {
+        'tolerance': tolerance,
+        'same_environment': {
+            key: results['environment'].get(key) == baseline.get('environment', {}).get(key)
+            for key in ('cpu_count', 'torch_threads', 'torch', 'cuda')
+        },
+        'regressions': [change for change in changes if change['regression']],
+        'changes': changes
+    }
+
+def write_report(suite: str, results: Dict[str, Any], args) -> int:
+    """Print and optionally save the results, compare them with a baseline, and return the exit status"""
+    report = {'suite': suite, 'environment': environment(), 'results': results}
+    status = 0
+    # Compare before saving, so --save-baseline can replace the baseline it is compared against
+    if getattr(args, 'baseline', None) and os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            report['comparison'] = compare(report, json.load(f), args.tolerance)
+        status = 1 if report['comparison']['regressions'] else 0
+    if getattr(args, 'output', None):
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if getattr(args, 'save_baseline', None):
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2))
+    return status
+
+def add_report_arguments(parser: argparse.ArgumentParser, suite: str):
+    parser.add_argument("--output", help="Write the results JSON to this path")
+    parser.add_argument("--baseline", default=os.path.join("benchmarks", "baselines", f"{suite}.json"),
+                        help="Compare against this results file when it exists; exit 1 on regressions")
+    parser.add_argument("--save-baseline", help="Store this run as the baseline at this path")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Relative slowdown tolerated before a metric counts as a regression")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compare_parser = subparsers.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with open(args.results, 'r') as f:
+        results = json.load(f)
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    comparison = compare(results, baseline, args.tolerance)
+    print(json.dumps(comparison, indent=2))
+    sys.exit(1 if comparison['regressions'] else 0)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
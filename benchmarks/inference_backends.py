@@ -0,0 +1,75 @@
+"""Compare latency, throughput and prediction parity of the Predictor inference backends.
+
+The ONNX graph is exported next to the checkpoint first if it does not exist yet.
+
+Usage:
+    python -m benchmarks.inference_backends --model-path best_model.pt --backends torch int8 onnx --batch-sizes 1 8 32 64
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Dict, Any, List
+import numpy as np
+import torch
+from src.model.backends import BACKENDS, compare_backends, default_onnx_path, export_onnx
+from src.model.predictor import Predictor
+from benchmarks.batch_predict import generate_corpus
+
+def time_backend(predictor: Predictor, texts: List[str], batch_size: int, repeats: int) -> Dict[str, Any]:
+    """Forward-pass latency per batch and throughput, excluding cleaning and tokenization"""
+    input_ids = predictor.tokenize_batch(texts)
+    batches = [predictor.pad_batch(input_ids[i:i + batch_size]) for i in range(0, len(input_ids), batch_size)]
+    predictor.backend(**batches[0])  # warm-up
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for batch in batches:
+            batch_start = time.perf_counter()
+            predictor.backend(**batch)
+            latencies.append(time.perf_counter() - batch_start)
+    elapsed = time.perf_counter() - start
+    return {
+        'batch_size': batch_size,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p95_ms': float(np.percentile(latencies, 95) * 1000),
+        'samples_per_sec': len(texts) * repeats / elapsed
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model-path", default="best_model.pt")
+    parser.add_argument("--model-name", default="bert-base-uncased")
+    parser.add_argument("--num-classes", type=int, default=5)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--num-texts", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--num-threads", type=int, default=torch.get_num_threads())
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.num_threads)
+    texts = generate_corpus(args.num_texts)
+    if "onnx" in args.backends and not os.path.exists(default_onnx_path(args.model_path)):
+        from src.model.architecture import TransformerClassifier
+        export_onnx(TransformerClassifier.load(args.model_name, args.num_classes, args.model_path), default_onnx_path(args.model_path))
+
+    predictors = {
+        backend: Predictor(args.model_path, args.model_name, args.num_classes, device="cpu", backend=backend, num_threads=args.num_threads)
+        for backend in args.backends
+    }
+    report = {'num_texts': len(texts), 'num_threads': args.num_threads, 'backends': {}}
+    for backend, predictor in predictors.items():
+        report['backends'][backend] = {
+            'memory_mb': predictor.backend.memory_bytes() / 2**20,
+            'timings': [time_backend(predictor, texts, batch_size, args.repeats) for batch_size in args.batch_sizes]
+        }
+        if backend != "torch" and "torch" in predictors:
+            report['backends'][backend]['parity'] = compare_backends(predictors["torch"], predictor, texts)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
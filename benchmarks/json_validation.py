@@ -0,0 +1,77 @@
+"""Measure streaming JSON / JSON Lines validation throughput and peak memory.
+
+Usage:
+    python -m benchmarks.json_validation --num-records 2000000 --format jsonl
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import tempfile
+import time
+from src.preprocessing.data_validator import DataValidator
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "number"},
+        "name": {"type": "string"},
+        "age": {"type": "number"},
+        "tags": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["id", "name"]
+}
+
+def generate_file(path: str, num_records: int, format: str, invalid_rate: float = 0.001, seed: int = 42):
+    rng = random.Random(seed)
+    with open(path, 'w') as f:
+        if format == "array":
+            f.write("[\n")
+        for i in range(num_records):
+            record = {"id": i, "name": f"user-{i}", "age": rng.randint(18, 90), "tags": ["a", "b"]}
+            if rng.random() < invalid_rate:
+                record["id"] = "not-a-number"
+            line = json.dumps(record)
+            if format == "array":
+                f.write(line + (",\n" if i < num_records - 1 else "\n"))
+            else:
+                f.write(line + "\n")
+        if format == "array":
+            f.write("]\n")
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--num-records", type=int, default=2000000)
+    parser.add_argument("--format", choices=["jsonl", "array"], default="jsonl")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"records.{args.format}")
+        generate_file(path, args.num_records, args.format)
+        rss_before = peak_rss_mb()
+
+        validator = DataValidator()
+        start = time.perf_counter()
+        report = validator.validate_json_stream(path, SCHEMA, format=args.format)
+        elapsed = time.perf_counter() - start
+
+        print(json.dumps({
+            'format': args.format,
+            'file_mb': os.path.getsize(path) / 2**20,
+            'records': report['records'],
+            'invalid_records': report['invalid_records'],
+            'seconds': elapsed,
+            'records_per_sec': report['records'] / elapsed,
+            'peak_rss_mb_before': rss_before,
+            'peak_rss_mb': peak_rss_mb()
+        }, indent=2))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
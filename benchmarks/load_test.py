@@ -0,0 +1,209 @@
+"""End-to-end HTTP load test of the prediction API, reporting p50/p95/p99 latency and throughput.
+
+By default the app is driven in-process through httpx's ASGI transport, so no
+server, Redis, PostgreSQL or model download is needed: the predict routes are
+mounted on a FastAPI app wired the way the lifespan in src/api/main.py wires
+them (model registry, inference executor, batching queue, rate limiter), using
+a tiny randomly initialised BERT unless --model-path is given. The load
+generator shares the event loop and CPU with the app, so absolute numbers are
+lower than against a separate server; use --url (and --token) for that.
+
+Closed-loop mode keeps --concurrency requests in flight. With --rate, requests
+arrive as a Poisson process at that many per second and latency is measured
+from each request's scheduled start, so a backed-up server is not hidden by
+the generator slowing down.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 1 16 64 --requests 2000
+    python -m benchmarks.load_test --endpoints batch-predict --batch-items 32 --rate 50 --duration 30
+    python -m benchmarks.load_test --url http://localhost:8000 --token $TOKEN --concurrency 32
+"""
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+import httpx
+import torch
+from benchmarks.batch_predict import WORDS, generate_corpus
+from benchmarks.harness import build_tiny_model, latency_summary, write_report, add_report_arguments
+
+ENDPOINTS = {'predict': "/api/v1/predict", 'batch-predict': "/api/v1/batch-predict"}
+
+def build_app(model_path: str, model_name: str, args):
+    """FastAPI app serving the predict routes, wired like the production lifespan"""
+    from fastapi import FastAPI
+    from src.api.routes import predict
+    from src.api.middleware.rate_limit import RateLimiter
+    from src.model.registry import ModelRegistry
+    from src.model.executor import InferenceExecutor
+    from src.model.batching import BatchingQueue
+
+    if args.threads:
+        # Process-wide, as in the thread-mode lifespan
+        torch.set_num_threads(args.threads)
+    spec = {'model_path': model_path, 'model_name': model_name, 'num_classes': args.num_classes, 'max_length': args.max_length}
+    registry = ModelRegistry(device="cpu")
+    predictor = registry.load(model_path, model_name, args.num_classes, num_threads=args.threads, max_length=args.max_length)
+    executor = InferenceExecutor(spec, predictor=predictor, max_workers=args.workers, max_pending=args.max_pending, name="bench")
+    batcher = BatchingQueue(executor, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                            max_queue_size=args.max_queue_size, name="bench")
+
+    app = FastAPI()
+    app.include_router(predict.router, prefix="/api/v1")
+    app.state.serving_config = {'default_model': "bench", 'models': {'bench': spec}}
+    app.state.model_registry = registry
+    app.state.executors = {'bench': executor}
+    app.state.batchers = {'bench': batcher}
+    # Local buckets with a limit no benchmark reaches, so no Redis is needed and nothing is throttled
+    app.state.rate_limiter = RateLimiter(requests_per_minute=10 ** 9, redis_url=None)
+    app.state.prediction_log = None
+    return app, batcher, executor
+
+def make_payload(endpoint: str, texts: List[str], rng: random.Random, batch_items: int) -> Dict[str, Any]:
+    if endpoint == "batch-predict":
+        return {'texts': rng.sample(texts, batch_items)}
+    return {'text': rng.choice(texts)}
+
+async def send(client: httpx.AsyncClient, endpoint: str, payload: Dict[str, Any], headers: Dict[str, str]) -> int:
+    try:
+        response = await client.post(ENDPOINTS[endpoint], json=payload, headers=headers)
+        return response.status_code
+    except httpx.HTTPError:
+        return 0
+
+async def closed_loop(client, endpoint, texts, headers, args, concurrency: int) -> Tuple[List[float], Counter, float]:
+    """Keep concurrency requests in flight until --requests have completed or --duration has passed"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    issued = 0
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    async def worker(seed: int):
+        nonlocal issued
+        rng = random.Random(seed)
+        while (deadline is None and issued < args.requests) or (deadline is not None and time.perf_counter() < deadline):
+            issued += 1
+            payload = make_payload(endpoint, texts, rng, args.batch_items)
+            start = time.perf_counter()
+            status = await send(client, endpoint, payload, headers)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(seed) for seed in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - start
+
+async def open_loop(client, endpoint, texts, headers, args) -> Tuple[List[float], Counter, float]:
+    """Poisson arrivals at --rate per second; latency counts from each request's scheduled start"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    rng = random.Random(0)
+    total = int(args.rate * args.duration) if args.duration else args.requests
+
+    async def one(scheduled: float, payload: Dict[str, Any]):
+        status = await send(client, endpoint, payload, headers)
+        latencies.append(time.perf_counter() - scheduled)
+        statuses[status] += 1
+
+    tasks = []
+    start = time.perf_counter()
+    scheduled = start
+    for _ in range(total):
+        scheduled += rng.expovariate(args.rate)
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(scheduled, make_payload(endpoint, texts, rng, args.batch_items))))
+    await asyncio.gather(*tasks)
+    return latencies, statuses, time.perf_counter() - start
+
+def summarize(latencies: List[float], statuses: Counter, elapsed: float, texts_per_request: int) -> Dict[str, Any]:
+    ok = statuses.get(200, 0)
+    return {
+        'requests': len(latencies),
+        'ok': ok,
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+        'error_rate': 1 - ok / len(latencies) if latencies else 0.0,
+        'seconds': elapsed,
+        'requests_per_sec': len(latencies) / elapsed,
+        'texts_per_sec': ok * texts_per_request / elapsed,
+        **latency_summary(latencies)
+    }
+
+async def run(args) -> Dict[str, Any]:
+    texts = generate_corpus(args.num_texts, max_words=args.max_words)
+    batcher = executor = None
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+            token = args.token
+        else:
+            from src.api.middleware.auth import AuthConfig
+
+            model_path, model_name = args.model_path, args.model_name
+            if model_path is None:
+                model_path, model_name = build_tiny_model(tmp, WORDS, num_classes=args.num_classes)
+            app, batcher, executor = build_app(model_path, model_name, args)
+            await batcher.start()
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=args.timeout)
+            token = AuthConfig.create_access_token({'sub': "load-test"})
+        headers = {'Authorization': f"Bearer {token}"} if token else {}
+
+        results = {}
+        try:
+            for endpoint in args.endpoints:
+                texts_per_request = args.batch_items if endpoint == "batch-predict" else 1
+                # Warm-up requests load kernels and fill allocator pools; they are not recorded
+                warmup = argparse.Namespace(**{**vars(args), 'requests': args.warmup, 'duration': None})
+                await closed_loop(client, endpoint, texts, headers, warmup, min(args.warmup, 4) or 1)
+                if args.rate:
+                    latencies, statuses, elapsed = await open_loop(client, endpoint, texts, headers, args)
+                    results[f"{endpoint}/rate{args.rate:g}"] = summarize(latencies, statuses, elapsed, texts_per_request)
+                    continue
+                for concurrency in args.concurrency:
+                    latencies, statuses, elapsed = await closed_loop(client, endpoint, texts, headers, args, concurrency)
+                    results[f"{endpoint}/c{concurrency}"] = summarize(latencies, statuses, elapsed, texts_per_request)
+        finally:
+            await client.aclose()
+            if batcher is not None:
+                await batcher.stop()
+                executor.shutdown()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=["predict"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per run (ignored with --duration)")
+    parser.add_argument("--duration", type=float, help="Seconds per run instead of a fixed request count")
+    parser.add_argument("--rate", type=float, help="Open-loop arrival rate in requests/sec instead of fixed concurrency")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--batch-items", type=int, default=16, help="Texts per batch-predict request")
+    parser.add_argument("--num-texts", type=int, default=1000)
+    parser.add_argument("--max-words", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--url", help="Load test a running server instead of the in-process app")
+    parser.add_argument("--token", help="Bearer token for --url")
+    parser.add_argument("--model-path", help="Checkpoint to serve in-process; a tiny random model is used when omitted")
+    parser.add_argument("--model-name", default="bert-base-uncased")
+    parser.add_argument("--num-classes", type=int, default=5)
+    parser.add_argument("--max-length", type=int, default=256)
+    parser.add_argument("--threads", type=int, help="torch intra-op threads for the in-process model")
+    parser.add_argument("--workers", type=int, default=1, help="Inference executor workers")
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-queue-size", type=int, default=1024)
+    add_report_arguments(parser, "load_test")
+    args = parser.parse_args()
+
+    sys.exit(write_report("load_test", asyncio.run(run(args)), args))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
@@ -0,0 +1,154 @@
+"""Micro-benchmarks for the inference hot path: cleaning, tokenization, forward pass, prediction and features.
+
+Every benchmark runs on the synthetic corpus from benchmarks.batch_predict.
+Model benchmarks use a tiny randomly initialised BERT written to a scratch
+directory, so nothing is downloaded; pass --model-path and --model-name to
+measure a real checkpoint instead. Feature generation needs the sentence
+encoder and is reported as skipped when it cannot be loaded.
+
+Usage:
+    python -m benchmarks.micro --output results/micro.json
+    python -m benchmarks.micro --save-baseline benchmarks/baselines/micro.json
+    python -m benchmarks.micro --only forward --batch-sizes 1 8 32 --seq-lengths 32 128 512
+"""
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from typing import Dict, Any, List
+import torch
+from benchmarks.batch_predict import WORDS, generate_corpus
+from benchmarks.harness import build_tiny_model, latency_summary, median, time_calls, write_report, add_report_arguments
+
+BENCHMARKS = ("clean", "tokenize", "forward", "predict", "features")
+
+def bench_clean(texts: List[str], args) -> Dict[str, Any]:
+    from src.preprocessing.text_cleaner import TextCleaner
+
+    results = {}
+    for tokenizer in ("nltk", "regex"):
+        cleaner = TextCleaner(tokenizer=tokenizer)
+        timings = time_calls(lambda: [cleaner.clean_text(text) for text in texts], args.repeats, args.warmup)
+        results[f"clean/{tokenizer}"] = {
+            'texts': len(texts),
+            'texts_per_sec': len(texts) / median(timings),
+            'batch_ms': median(timings) * 1000
+        }
+    return results
+
+def bench_tokenize(predictor, texts: List[str], args) -> Dict[str, Any]:
+    from src.preprocessing.truncation import encode_segments
+
+    cleaned = [predictor.text_cleaner.clean_text(text) or '' for text in texts]
+    results = {}
+    for max_length in args.seq_lengths:
+        for strategy in ("head", "head_tail"):
+            timings = time_calls(
+                lambda: encode_segments(predictor.tokenizer, cleaned, max_length=max_length, strategy=strategy),
+                args.repeats, args.warmup
+            )
+            results[f"tokenize/{strategy}/len{max_length}"] = {
+                'texts': len(texts),
+                'texts_per_sec': len(texts) / median(timings),
+                'batch_ms': median(timings) * 1000
+            }
+    return results
+
+def bench_forward(predictor, args) -> Dict[str, Any]:
+    """Backend forward pass alone on random full-length inputs"""
+    vocab_size = len(predictor.tokenizer)
+    generator = torch.Generator().manual_seed(0)
+    results = {}
+    for seq_length in args.seq_lengths:
+        for batch_size in args.batch_sizes:
+            input_ids = torch.randint(len(predictor.tokenizer.all_special_ids), vocab_size, (batch_size, seq_length), generator=generator)
+            inputs = {
+                'input_ids': input_ids.to(predictor.device),
+                'attention_mask': torch.ones_like(input_ids).to(predictor.device)
+            }
+            timings = time_calls(lambda: predictor.backend(**inputs).cpu(), args.repeats, args.warmup)
+            results[f"forward/batch{batch_size}/len{seq_length}"] = {
+                'sequences_per_sec': batch_size / median(timings),
+                'tokens_per_sec': batch_size * seq_length / median(timings),
+                **latency_summary(timings)
+            }
+    return results
+
+def bench_predict(predictor, texts: List[str], args) -> Dict[str, Any]:
+    """Predictor.batch_predict end to end, without a prediction cache"""
+    predictor.cache = None
+    results = {}
+    for batch_size in args.batch_sizes:
+        timings = time_calls(lambda: predictor.batch_predict(texts, batch_size=batch_size), args.repeats, args.warmup)
+        results[f"predict/batch{batch_size}"] = {
+            'texts': len(texts),
+            'texts_per_sec': len(texts) / median(timings),
+            'call_ms': median(timings) * 1000
+        }
+    return results
+
+def bench_features(texts: List[str], args) -> Dict[str, Any]:
+    try:
+        from src.preprocessing.feature_generator import FeatureGenerator
+        generator = FeatureGenerator(device="cpu")
+    except Exception as e:
+        return {'features': {'skipped': f"{type(e).__name__}: {e}"}}
+
+    start = time.perf_counter()
+    generator.fit(texts)
+    fit_seconds = time.perf_counter() - start
+    timings = time_calls(lambda: generator.transform(texts), args.repeats, args.warmup)
+    generator.close()
+    return {
+        'features/fit': {'texts': len(texts), 'texts_per_sec': len(texts) / fit_seconds},
+        'features/transform': {'texts': len(texts), 'texts_per_sec': len(texts) / median(timings), 'batch_ms': median(timings) * 1000}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--model-path", help="Checkpoint to benchmark; a tiny random model is used when omitted")
+    parser.add_argument("--model-name", default="bert-base-uncased")
+    parser.add_argument("--num-classes", type=int, default=5)
+    parser.add_argument("--num-texts", type=int, default=256)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seq-lengths", type=int, nargs="+", default=[32, 128, 512])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--threads", type=int, help="torch intra-op threads (default: torch's choice)")
+    add_report_arguments(parser, "micro")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+    texts = generate_corpus(args.num_texts)
+    results: Dict[str, Any] = {}
+
+    if "clean" in args.only:
+        results.update(bench_clean(texts, args))
+    if "features" in args.only:
+        results.update(bench_features(texts, args))
+
+    if {"tokenize", "forward", "predict"} & set(args.only):
+        from src.model.predictor import Predictor
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path, model_name = args.model_path, args.model_name
+            if model_path is None:
+                model_path, model_name = build_tiny_model(tmp, WORDS, num_classes=args.num_classes,
+                                                          max_position_embeddings=max(args.seq_lengths))
+            predictor = Predictor(model_path, model_name, args.num_classes, device="cpu", max_length=max(args.seq_lengths))
+            if "tokenize" in args.only:
+                results.update(bench_tokenize(predictor, texts, args))
+            if "forward" in args.only:
+                results.update(bench_forward(predictor, args))
+            if "predict" in args.only:
+                results.update(bench_predict(predictor, texts, args))
+
+    sys.exit(write_report("micro", results, args))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
@@ -0,0 +1,94 @@
+"""Measure per-request rate limiter overhead under concurrency.
+
+Modes:
+    legacy  - a new Redis client per request, INCR then EXPIRE (the previous behaviour)
+    script  - the shared-pool limiter, one token-bucket script call per request
+    lease   - the shared-pool limiter spending locally leased tokens
+    local   - in-process buckets only (the degraded mode)
+
+Usage:
+    python -m benchmarks.rate_limiter --redis-url redis://localhost:6379/0 --concurrency 64 --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Any, List
+import numpy as np
+from redis.asyncio import Redis
+from src.api.middleware.rate_limit import RateLimiter
+
+MODES = ("legacy", "script", "lease", "local")
+
+async def legacy_check(redis_url: str, user_id: str, limit: int) -> bool:
+    redis = Redis.from_url(redis_url)
+    try:
+        key = f"rate_limit_legacy:{user_id}"
+        current = await redis.incr(key)
+        if current == 1:
+            await redis.expire(key, 60)
+        return current <= limit
+    finally:
+        await redis.aclose()
+
+async def run_mode(mode: str, args) -> Dict[str, Any]:
+    # A limit high enough that every request is allowed, so all modes do the same work
+    limit = args.requests * 10
+    limiter = None
+    if mode != "legacy":
+        limiter = RateLimiter(
+            requests_per_minute=limit,
+            redis_url=None if mode == "local" else args.redis_url,
+            local_lease=args.lease if mode == "lease" else 1,
+            redis_timeout=1.0,
+            prefix=f"rate_limit_bench_{mode}:"
+        )
+
+    latencies: List[float] = []
+    per_task = args.requests // args.concurrency
+
+    async def worker(task_id: int):
+        for i in range(per_task):
+            user_id = f"user-{(task_id + i) % args.users}"
+            start = time.perf_counter()
+            if limiter is None:
+                await legacy_check(args.redis_url, user_id, limit)
+            else:
+                await limiter.check_rate_limit(user_id)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(task_id) for task_id in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    if limiter is not None:
+        await limiter.close()
+
+    latencies_us = np.array(latencies) * 1e6
+    return {
+        'mode': mode,
+        'checks': len(latencies),
+        'checks_per_sec': len(latencies) / elapsed,
+        'mean_us': float(latencies_us.mean()),
+        'p50_us': float(np.percentile(latencies_us, 50)),
+        'p99_us': float(np.percentile(latencies_us, 99))
+    }
+
+async def main_async(args):
+    return [await run_mode(mode, args) for mode in args.modes]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--redis-url", default="redis://localhost:6379/0")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--lease", type=int, default=10)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
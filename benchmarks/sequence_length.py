@@ -0,0 +1,106 @@
+"""Report accuracy and throughput versus sequence length and truncation strategy.
+
+Every configuration runs the same checkpoint over a labelled CSV. Results are
+broken down by each document's full token length, and agreement is measured
+against the first configuration (normally the 512-token baseline).
+
+Usage:
+    python -m benchmarks.sequence_length --model-path best_model.pt --data data/processed/validation.csv \\
+        --configs 512:head 256:head 256:head_tail 128:head_tail 128:sliding_window
+"""
+import argparse
+import copy
+import json
+import logging
+import time
+from typing import Dict, Any, List, Optional
+import numpy as np
+import pandas as pd
+from src.model.predictor import Predictor
+from benchmarks.batch_predict import generate_corpus
+
+LENGTH_BUCKETS = [(0, 128, "<=128"), (129, 256, "129-256"), (257, 512, "257-512"), (513, None, ">512")]
+
+def bucket_of(length: int) -> str:
+    for low, high, name in LENGTH_BUCKETS:
+        if length >= low and (high is None or length <= high):
+            return name
+    return LENGTH_BUCKETS[-1][2]
+
+def run_config(predictor: Predictor,
+               max_length: int,
+               truncation: str,
+               texts: List[str],
+               labels: Optional[np.ndarray],
+               buckets: List[str],
+               batch_size: int) -> Dict[str, Any]:
+    configured = copy.copy(predictor)
+    configured.max_length = max_length
+    configured.truncation = truncation
+    configured.cache = None
+
+    start = time.perf_counter()
+    results = configured.batch_predict(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    preds = np.array([r['prediction'] for r in results])
+
+    report = {
+        'max_length': max_length,
+        'truncation': truncation,
+        'model_inputs': len(configured.tokenize_batch(texts)),
+        'seconds': elapsed,
+        'samples_per_sec': len(texts) / elapsed,
+        'predictions': preds
+    }
+    if labels is not None:
+        report['accuracy'] = float((preds == labels).mean())
+        buckets = np.asarray(buckets)
+        report['accuracy_by_length'] = {
+            name: float((preds[buckets == name] == labels[buckets == name]).mean())
+            for _, _, name in LENGTH_BUCKETS if (buckets == name).any()
+        }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model-path", default="best_model.pt")
+    parser.add_argument("--model-name", default="bert-base-uncased")
+    parser.add_argument("--num-classes", type=int, default=5)
+    parser.add_argument("--data", help="CSV with text and integer label columns; a synthetic corpus is used when omitted")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--label-column", default="label")
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--configs", nargs="+", default=["512:head", "256:head", "256:head_tail", "128:head_tail", "128:sliding_window"])
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    if args.data:
+        data = pd.read_csv(args.data, nrows=args.limit)
+        texts = data[args.text_column].fillna('').astype(str).tolist()
+        labels = data[args.label_column].to_numpy() if args.label_column in data else None
+    else:
+        texts, labels = generate_corpus(args.limit), None
+
+    predictor = Predictor(args.model_path, args.model_name, args.num_classes, device="cpu")
+    cleaned = [predictor.text_cleaner.clean_text(text) or '' for text in texts]
+    lengths = [len(ids) for ids in predictor.tokenizer(cleaned, add_special_tokens=False)['input_ids']]
+    buckets = [bucket_of(length) for length in lengths]
+
+    reports = []
+    for config in args.configs:
+        max_length, truncation = config.split(":")
+        reports.append(run_config(predictor, int(max_length), truncation, texts, labels, buckets, args.batch_size))
+
+    baseline = reports[0]['predictions']
+    for report in reports:
+        report['agreement_with_baseline'] = float((report.pop('predictions') == baseline).mean())
+        report['speedup'] = report['samples_per_sec'] / reports[0]['samples_per_sec']
+    print(json.dumps({
+        'num_texts': len(texts),
+        'texts_by_length': {name: buckets.count(name) for _, _, name in LENGTH_BUCKETS},
+        'configs': reports
+    }, indent=2))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
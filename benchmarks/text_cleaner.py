@@ -0,0 +1,78 @@
+"""Measure TextCleaner throughput in texts/sec against the previous implementation.
+
+Usage:
+    python -m benchmarks.text_cleaner --num-texts 20000 --n-jobs 4
+"""
+import argparse
+import json
+import logging
+import random
+import re
+import time
+import unicodedata
+from typing import List
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+from nltk.stem import WordNetLemmatizer
+from src.preprocessing.text_cleaner import TextCleaner
+
+WORDS = ["The", "customers", "were", "running", "invoices", "shipped", "Cafés", "boxes", "geese",
+         "payment's", "studies", "better", "networks", "2024", "#urgent", "don't", "leaves", "analyses"]
+
+def generate_corpus(num_texts: int, seed: int = 42) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 120))) for _ in range(num_texts)]
+
+class LegacyTextCleaner:
+    """The cleaner as it was before the fast path, kept as the equivalence reference"""
+
+    def __init__(self):
+        self.stop_words = set(stopwords.words('english'))
+        self.lemmatizer = WordNetLemmatizer()
+
+    def clean_text(self, text: str) -> str:
+        text = text.lower()
+        text = re.sub(r'[^a-zA-Z\s]', '', text)
+        text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('utf-8')
+        tokens = word_tokenize(text)
+        filtered_tokens = [word for word in tokens if word not in self.stop_words]
+        return ' '.join(self.lemmatizer.lemmatize(token) for token in filtered_tokens)
+
+def texts_per_second(fn, texts: List[str]) -> float:
+    start = time.perf_counter()
+    fn(texts)
+    return len(texts) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--num-texts", type=int, default=10000)
+    parser.add_argument("--n-jobs", type=int, default=4)
+    args = parser.parse_args()
+
+    texts = generate_corpus(args.num_texts)
+    legacy = LegacyTextCleaner()
+    cleaner = TextCleaner()
+    regex_cleaner = TextCleaner(tokenizer="regex")
+
+    # Default settings must reproduce the previous output exactly
+    expected = [legacy.clean_text(text) for text in texts]
+    mismatches = sum(a != b for a, b in zip(expected, cleaner.batch_clean(texts)))
+    if mismatches:
+        raise AssertionError(f"{mismatches} texts differ from the legacy cleaner")
+    parallel = cleaner.batch_clean(texts, n_jobs=args.n_jobs)
+    if parallel != expected:
+        raise AssertionError("Parallel batch_clean differs from the legacy cleaner")
+
+    report = {
+        'num_texts': len(texts),
+        'legacy_texts_per_sec': texts_per_second(lambda t: [legacy.clean_text(x) for x in t], texts),
+        'fast_texts_per_sec': texts_per_second(TextCleaner().batch_clean, texts),
+        'regex_tokenizer_texts_per_sec': texts_per_second(regex_cleaner.batch_clean, texts),
+        'parallel_texts_per_sec': texts_per_second(lambda t: cleaner.batch_clean(t, n_jobs=args.n_jobs), texts),
+        'regex_tokenizer_mismatches': sum(a != b for a, b in zip(expected, regex_cleaner.batch_clean(texts)))
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
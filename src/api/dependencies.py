@@ -0,0 +1,41 @@
+from typing import Optional
+from fastapi import Request, HTTPException
+from src.model.predictor import Predictor
+from src.model.registry import ModelRegistry
+from src.model.batching import BatchingQueue
+from src.model.executor import InferenceExecutor
+from src.monitoring.prediction_log import PredictionLogSink
+
+def get_model_registry(request: Request) -> ModelRegistry:
+    """Dependency returning the registry created at application startup"""
+    return request.app.state.model_registry
+
+def get_prediction_log(request: Request) -> Optional[PredictionLogSink]:
+    """Dependency returning the prediction log sink, or None when logging is disabled"""
+    return getattr(request.app.state, "prediction_log", None)
+
+def get_predictor(request: Request) -> Predictor:
+    """Dependency returning the shared predictor for the default model"""
+    registry = get_model_registry(request)
+    serving = request.app.state.serving_config
+    model = serving['models'][serving['default_model']]
+    try:
+        return registry.get(model['model_path'], model['model_name'], model['num_classes'], **Predictor.options_from_spec(model))
+    except KeyError:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+def get_batcher(request: Request) -> BatchingQueue:
+    """Dependency returning the batching queue for the default model"""
+    serving = request.app.state.serving_config
+    try:
+        return request.app.state.batchers[serving['default_model']]
+    except KeyError:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+def get_executor(request: Request) -> InferenceExecutor:
+    """Dependency returning the inference executor for the default model"""
+    serving = request.app.state.serving_config
+    try:
+        return request.app.state.executors[serving['default_model']]
+    except KeyError:
+        raise HTTPException(status_code=503, detail="Model not loaded")
@@ -1,15 +1,114 @@
+import os
+import logging
+from contextlib import asynccontextmanager
+import yaml
+import torch
 from fastapi import FastAPI, HTTPException, Depends
+from fastapi.security import HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_client import make_asgi_app
 from .routes import categorization, models, feedback
-from .middleware.auth import get_current_user
-from .middleware.rate_limiter import RateLimiter
+from .middleware import auth
+from .middleware.auth import get_current_user, security
+from .middleware.rate_limit import RateLimiter, enforce_rate_limit
 from .middleware.logging import LoggingMiddleware
+from src.model.predictor import Predictor
+from src.model.registry import ModelRegistry
+from src.model.batching import BatchingQueue
+from src.model.executor import InferenceExecutor
+from src.model.cache import build_cache
+from src.monitoring.prediction_log import build_prediction_log
+from src.monitoring.profiling import TraceSampler
+
+logger = logging.getLogger(__name__)
+
+def load_config(path: str = None) -> dict:
+    """Load application configuration"""
+    path = path or os.environ.get("CONFIG_PATH", "config/example.yaml")
+    with open(path, 'r') as f:
+        return yaml.safe_load(f)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load every configured model once before serving requests"""
+    config = load_config()
+    serving = config['serving']
+    batching = serving.get('batching', {})
+    executor_config = serving.get('executor', {})
+    mode = executor_config.get('mode', 'thread')
+    if mode == 'thread' and executor_config.get('num_threads'):
+        # torch's intra-op pool is process-wide, so thread workers and every model share this one setting
+        torch.set_num_threads(executor_config['num_threads'])
+    registry = ModelRegistry(cache=build_cache(serving.get('cache')))
+    executors = {}
+    batchers = {}
+    profilers = {}
+    for name, model in serving['models'].items():
+        logger.info(f"Loading model '{name}'")
+        # Models without their own max_length use the global model.params.max_sequence_length
+        model.setdefault('max_length', config.get('model', {}).get('params', {}).get('max_sequence_length', 512))
+        # Process workers load their own model copies, so the parent skips loading one
+        predictor = None
+        if mode == 'thread':
+            predictor = registry.load(
+                model['model_path'],
+                model['model_name'],
+                model['num_classes'],
+                num_threads=executor_config.get('num_threads'),
+                **Predictor.options_from_spec(model)
+            )
+        executors[name] = InferenceExecutor(
+            model,
+            predictor=predictor,
+            mode=mode,
+            max_workers=executor_config.get('max_workers', 1),
+            max_pending=executor_config.get('max_pending', 64),
+            num_threads=executor_config.get('num_threads'),
+            retry_after=executor_config.get('retry_after', 1),
+            cache_config=serving.get('cache'),
+            name=name
+        )
+        batchers[name] = BatchingQueue(
+            executors[name],
+            max_batch_size=batching.get('max_batch_size', 32),
+            max_wait_ms=batching.get('max_wait_ms', 5.0),
+            max_queue_size=batching.get('max_queue_size', 1024),
+            name=name
+        )
+        await batchers[name].start()
+        # Traces are captured in this process, so profiling needs the thread executor's shared predictor
+        sampler = TraceSampler.from_config(serving.get('profiling'))
+        if sampler is not None and predictor is not None:
+            predictor.profiler = sampler
+            profilers[name] = sampler
+    # One limiter, and one Redis connection pool, for the whole app
+    rate_limiter = RateLimiter.from_config(config.get('security', {}).get('rate_limit'))
+    app.state.rate_limiter = rate_limiter
+    auth.configure_token_cache(config.get('security', {}).get('token_cache'))
+    prediction_log = build_prediction_log(config.get('database'))
+    if prediction_log is not None:
+        await prediction_log.start()
+    app.state.prediction_log = prediction_log
+    app.state.serving_config = serving
+    app.state.model_registry = registry
+    app.state.executors = executors
+    app.state.batchers = batchers
+    app.state.profilers = profilers
+    yield
+    for batcher in batchers.values():
+        await batcher.stop()
+    for executor in executors.values():
+        executor.shutdown()
+    registry.clear()
+    await rate_limiter.close()
+    if prediction_log is not None:
+        await prediction_log.stop()
 
 app = FastAPI(
     title="AI Data Categorization System",
     description="A production-ready system for automatic data categorization using machine learning",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -23,8 +122,6 @@ app.add_middleware(
 
 # Add custom middleware
 app.add_middleware(LoggingMiddleware)
-rate_limiter = RateLimiter()
-app.add_middleware(rate_limiter)
 
 # Add Prometheus metrics
 metrics_app = make_asgi_app()
@@ -35,7 +132,7 @@ app.include_router(
     categorization.router,
     prefix="/api/v1",
     tags=["categorization"],
-    dependencies=[Depends(get_current_user)]
+    dependencies=[Depends(get_current_user), Depends(enforce_rate_limit)]
 )
 app.include_router(
     models.router,
@@ -51,3 +148,33 @@ app.include_router(
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.post("/auth/revoke")
+async def revoke_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Revoke the presented token so later requests with it are rejected"""
+    username = await get_current_user(credentials)
+    auth.token_cache.revoke(credentials.credentials)
+    return {"revoked": True, "user": username}
+
+@app.post("/debug/profile/{model}")
+async def capture_profile(model: str, captures: int = 1, user: str = Depends(get_current_user)):
+    """Profile the model's next few prediction calls and write their traces to disk"""
+    sampler = app.state.profilers.get(model)
+    if sampler is None:
+        raise HTTPException(status_code=404, detail=f"Profiling is not enabled for model '{model}'")
+    return {"model": model, "pending_captures": sampler.arm(captures), "output_dir": sampler.output_dir}
+
+@app.get("/debug/profile/{model}")
+async def list_profiles(model: str, user: str = Depends(get_current_user)):
+    """List the traces captured for a model"""
+    sampler = app.state.profilers.get(model)
+    if sampler is None:
+        raise HTTPException(status_code=404, detail=f"Profiling is not enabled for model '{model}'")
+    return {"model": model, "pending_captures": sampler.pending, "traces": sampler.traces}
+
+@app.get("/models/loaded")
+async def loaded_models():
+    return {
+        "models": app.state.model_registry.stats(),
+        "queue_depth": {name: batcher.depth for name, batcher in app.state.batchers.items()}
+    }
@@ -1,10 +1,15 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Any, Optional
 import jwt
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 import logging
+from src.monitoring.metrics import AUTH_CACHE_LOOKUPS, AUTH_CACHE_EVICTIONS, AUTH_REVOCATIONS
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +24,7 @@ class AuthConfig:
         try:
             to_encode = data.copy()
             expire = datetime.utcnow() + timedelta(minutes=AuthConfig.ACCESS_TOKEN_EXPIRE_MINUTES)
-            to_encode.update({"exp": expire})
+            to_encode.update({"exp": expire, "iat": datetime.utcnow()})
             return jwt.encode(to_encode, AuthConfig.SECRET_KEY, algorithm=AuthConfig.ALGORITHM)
         except Exception as e:
             logger.error(f"Error creating token: {e}")
@@ -38,17 +43,123 @@ class AuthConfig:
             logger.error("Invalid token")
             raise HTTPException(status_code=401, detail="Invalid token")
 
+class TokenCache:
+    """Bounded LRU cache of verified tokens, keyed by SHA-256 digest.
+
+    A hit returns the claims without re-verifying the signature. Entries never
+    outlive the token's ``exp`` claim (nor ``ttl_seconds``, so a rotated
+    secret takes effect), and revocation is checked on every lookup. Only
+    successfully verified tokens are cached, so invalid tokens cannot fill it.
+    Revocations are held in this process only.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._revoked: Dict[bytes, float] = {}
+        self._revoked_users: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "TokenCache":
+        """Build the cache from the security.token_cache config section"""
+        config = config or {}
+        return cls(max_size=config.get('max_size', 10000), ttl_seconds=config.get('ttl_seconds', 300))
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def verify(self, token: str) -> dict:
+        """Return the token's claims, verifying the signature only on a cache miss"""
+        key = self.digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, claims = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    AUTH_CACHE_LOOKUPS.labels(result="hit").inc()
+                    return claims
+                del self._entries[key]
+                AUTH_CACHE_EVICTIONS.labels(reason="expired").inc()
+            if key in self._revoked:
+                AUTH_CACHE_LOOKUPS.labels(result="revoked").inc()
+                raise HTTPException(status_code=401, detail="Token has been revoked")
+        AUTH_CACHE_LOOKUPS.labels(result="miss").inc()
+
+        claims = AuthConfig.decode_token(token)
+        with self._lock:
+            if self._is_revoked(key, claims):
+                AUTH_CACHE_LOOKUPS.labels(result="revoked").inc()
+                raise HTTPException(status_code=401, detail="Token has been revoked")
+            expires_at = now + self.ttl_seconds
+            if claims.get("exp") is not None:
+                expires_at = min(expires_at, float(claims["exp"]))
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                AUTH_CACHE_EVICTIONS.labels(reason="size").inc()
+        return claims
+
+    def _is_revoked(self, key: bytes, claims: dict) -> bool:
+        if key in self._revoked:
+            return True
+        revoked_at = self._revoked_users.get(claims.get("sub"))
+        # iat has one-second resolution, so tokens issued in the revocation's second are rejected too
+        return revoked_at is not None and int(claims.get("iat", 0)) <= revoked_at
+
+    def revoke(self, token: str):
+        """Reject this token from now on, even though its signature is still valid"""
+        try:
+            exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+        except jwt.InvalidTokenError:
+            exp = None
+        now = time.time()
+        with self._lock:
+            # Expired revocations need not be kept: decode_token rejects those tokens anyway
+            self._revoked = {key: until for key, until in self._revoked.items() if until > now}
+            key = self.digest(token)
+            self._revoked[key] = float(exp) if exp is not None else float("inf")
+            self._entries.pop(key, None)
+        AUTH_REVOCATIONS.labels(scope="token").inc()
+
+    def revoke_user(self, username: str):
+        """Reject every token issued to username up to and including the current second"""
+        with self._lock:
+            self._revoked_users[username] = int(time.time())
+            for key in [key for key, (_, claims) in self._entries.items() if claims.get("sub") == username]:
+                del self._entries[key]
+        AUTH_REVOCATIONS.labels(scope="user").inc()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 class User(BaseModel):
     username: str
     password: str
 
 security = HTTPBearer()
+token_cache = TokenCache()
+
+def configure_token_cache(config: Optional[Dict[str, Any]]) -> TokenCache:
+    """Replace the process-wide token cache with one built from config"""
+    global token_cache
+    token_cache = TokenCache.from_config(config)
+    return token_cache
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Get current authenticated user"""
     try:
         token = credentials.credentials
-        payload = AuthConfig.decode_token(token)
+        payload = token_cache.verify(token)
         username: str = payload.get("sub")
         if username is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
@@ -62,4 +173,11 @@ if __name__ == "__main__":
     token = AuthConfig.create_access_token({"sub": "testuser"})
     print(f"Generated token: {token}")
     decoded = AuthConfig.decode_token(token)
-    print(f"Decoded token: {decoded}")
\ No newline at end of file
+    print(f"Decoded token: {decoded}")
+    cache = TokenCache(max_size=2)
+    print(f"Cached claims match: {cache.verify(token) == cache.verify(token)}")
+    cache.revoke(token)
+    try:
+        cache.verify(token)
+    except HTTPException as e:
+        print(f"After revocation: {e.detail}")
\ No newline at end of file
@@ -1,50 +1,204 @@
-import logging
-from aioredis import Redis
-from fastapi import HTTPException, Depends
-from typing import Optional
 import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from fastapi import Depends, HTTPException, Request
+from redis.asyncio import ConnectionPool, Redis
+from src.api.middleware.auth import get_current_user
+from src.monitoring.metrics import RATE_LIMIT_DECISIONS, RATE_LIMIT_DEGRADED
 
 logger = logging.getLogger(__name__)
 
+# Token bucket kept in a Redis hash. Refills from the server clock, takes back the
+# ARGV[4] unspent tokens of the caller's expired lease, grants up to ARGV[3]
+# tokens (fewer if the bucket holds fewer) and returns how many it granted.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local refund = tonumber(ARGV[4]) or 0
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate + refund)
+local granted = math.min(requested, math.floor(tokens))
+tokens = tokens - granted
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return granted
+"""
+
+class TokenBucket:
+    """In-process token bucket refilled continuously at rate tokens per second"""
+
+    def __init__(self, capacity: float, rate: float, tokens: Optional[float] = None):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity if tokens is None else tokens
+        self.updated = time.monotonic()
+
+    def take(self, count: int = 1) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= count:
+            self.tokens -= count
+            return True
+        return False
+
+class _Lease:
+    """Tokens granted by Redis to this process, spendable until the lease expires"""
+
+    __slots__ = ("tokens", "expires")
+
+    def __init__(self, tokens: int, expires: float):
+        self.tokens = tokens
+        self.expires = expires
+
 class RateLimiter:
-    def __init__(self, requests_per_minute: int = 60):
+    """App-wide per-user rate limiter backed by an atomic Redis token bucket.
+
+    One instance is created at startup and shares a single connection pool.
+    Each check is one EVALSHA round trip. With ``local_lease`` > 1, a process
+    leases up to that many tokens per user at once and spends them locally,
+    going back to Redis when they run out or after ``sync_interval`` seconds,
+    so bursts cost one round trip per lease instead of one per request. Tokens
+    left in an expired lease are returned to the bucket on that next call. If
+    Redis errors or is slower than ``redis_timeout``, the limiter enforces the
+    same limit with in-process buckets for ``degraded_seconds`` before
+    retrying Redis.
+    """
+
+    def __init__(self,
+                 requests_per_minute: int = 60,
+                 redis_url: str = "redis://localhost:6379/0",
+                 local_lease: int = 1,
+                 sync_interval: float = 1.0,
+                 redis_timeout: float = 0.05,
+                 degraded_seconds: float = 5.0,
+                 max_connections: int = 50,
+                 max_local_keys: int = 100000,
+                 prefix: str = "rate_limit:"):
         self.requests_per_minute = requests_per_minute
-        self.redis = Redis(host='localhost', port=6379)
-        logger.info(f"Initialized RateLimiter with {requests_per_minute} requests per minute")
+        self.capacity = requests_per_minute
+        self.rate = requests_per_minute / 60.0
+        self.local_lease = max(1, local_lease)
+        self.sync_interval = sync_interval
+        self.redis_timeout = redis_timeout
+        self.degraded_seconds = degraded_seconds
+        self.max_local_keys = max_local_keys
+        self.prefix = prefix
+        self.pool = ConnectionPool.from_url(redis_url, max_connections=max_connections) if redis_url else None
+        self.redis = Redis(connection_pool=self.pool) if self.pool else None
+        self._script = self.redis.register_script(TOKEN_BUCKET_SCRIPT) if self.redis else None
+        self._leases: "OrderedDict[str, _Lease]" = OrderedDict()
+        self._local_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._degraded_until = 0.0 if self.redis else float("inf")
+        logger.info(f"Initialized RateLimiter with {requests_per_minute} requests per minute (lease {self.local_lease})")
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "RateLimiter":
+        """Build the limiter from the security.rate_limit config section"""
+        config = config or {}
+        return cls(
+            requests_per_minute=config.get('requests_per_minute', 60),
+            redis_url=config.get('redis_url', "redis://localhost:6379/0"),
+            local_lease=config.get('local_lease', 1),
+            sync_interval=config.get('sync_interval', 1.0),
+            redis_timeout=config.get('redis_timeout_ms', 50) / 1000,
+            degraded_seconds=config.get('degraded_seconds', 5.0),
+            max_connections=config.get('max_connections', 50)
+        )
+
+    @property
+    def degraded(self) -> bool:
+        return time.monotonic() < self._degraded_until
 
     async def check_rate_limit(self, user_id: str) -> bool:
         """Check if user has exceeded rate limit"""
-        try:
-            key = f"rate_limit:{user_id}"
-            current = await self.redis.incr(key)
-            
-            if current == 1:
-                await self.redis.expire(key, 60)
-            
-            if current > self.requests_per_minute:
-                logger.warning(f"Rate limit exceeded for user {user_id}")
-                return False
-                
+        if self.degraded:
+            return self._check_local(user_id)
+
+        lease = self._leases.get(user_id)
+        now = time.monotonic()
+        if lease is not None and lease.tokens > 0 and now < lease.expires:
+            lease.tokens -= 1
+            RATE_LIMIT_DECISIONS.labels(decision="allowed", source="lease").inc()
             return True
+
+        # Hand back what this process leased but did not spend, so other processes can use it
+        refund = lease.tokens if lease is not None else 0
+        try:
+            granted = await asyncio.wait_for(
+                self._script(keys=[self.prefix + user_id], args=[self.capacity, self.rate, self.local_lease, refund]),
+                timeout=self.redis_timeout
+            )
         except Exception as e:
-            logger.error(f"Rate limiting error: {e}")
-            raise HTTPException(status_code=500, detail="Rate limiting service unavailable")
+            self._enter_degraded_mode(e)
+            return self._check_local(user_id)
+
+        granted = int(granted)
+        if granted > 0:
+            self._store(self._leases, user_id, _Lease(granted - 1, now + self.sync_interval))
+            RATE_LIMIT_DECISIONS.labels(decision="allowed", source="redis").inc()
+            return True
+        self._leases.pop(user_id, None)
+        RATE_LIMIT_DECISIONS.labels(decision="denied", source="redis").inc()
+        logger.warning(f"Rate limit exceeded for user {user_id}")
+        return False
+
+    def _check_local(self, user_id: str) -> bool:
+        bucket = self._local_buckets.get(user_id)
+        if bucket is None:
+            bucket = self._store(self._local_buckets, user_id, TokenBucket(self.capacity, self.rate))
+        else:
+            self._local_buckets.move_to_end(user_id)
+        allowed = bucket.take()
+        RATE_LIMIT_DECISIONS.labels(decision="allowed" if allowed else "denied", source="local").inc()
+        return allowed
 
-async def get_rate_limiter() -> RateLimiter:
-    """Dependency to get rate limiter instance"""
-    return RateLimiter()
+    def _store(self, table: OrderedDict, user_id: str, value):
+        table[user_id] = value
+        table.move_to_end(user_id)
+        while len(table) > self.max_local_keys:
+            table.popitem(last=False)
+        return value
+
+    def _enter_degraded_mode(self, error: Exception):
+        if not self.degraded:
+            reason = "timeout" if isinstance(error, asyncio.TimeoutError) else repr(error)
+            logger.error(f"Rate limiter falling back to local buckets for {self.degraded_seconds}s: {reason}")
+        self._degraded_until = time.monotonic() + self.degraded_seconds
+        RATE_LIMIT_DEGRADED.inc()
+
+    async def close(self):
+        """Release the shared connection pool"""
+        if self.pool is not None:
+            await self.pool.disconnect()
+
+def get_rate_limiter(request: Request) -> RateLimiter:
+    """Dependency returning the limiter created at application startup"""
+    return request.app.state.rate_limiter
+
+async def enforce_rate_limit(request: Request, user: str = Depends(get_current_user)):
+    """Router dependency rejecting the authenticated user's request with 429 once they exceed the limit"""
+    if not await get_rate_limiter(request).check_rate_limit(user):
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
 if __name__ == "__main__":
-    import asyncio
     logging.basicConfig(level=logging.INFO)
-    
+
     async def test_rate_limiter():
         limiter = RateLimiter(requests_per_minute=2)
         user_id = "testuser"
-        
+
         for i in range(3):
             allowed = await limiter.check_rate_limit(user_id)
             print(f"Request {i+1}: {'Allowed' if allowed else 'Denied'}")
             await asyncio.sleep(1)
-    
-    asyncio.run(test_rate_limiter())
\ No newline at end of file
+        await limiter.close()
+
+    asyncio.run(test_rate_limiter())
@@ -1,55 +1,159 @@
+import asyncio
+import json
 from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict, Any
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional
 from ..schemas.request import CategoryRequest
 from ..schemas.response import CategoryResponse
 from ..services.model import ModelService
 from ..services.monitoring import MonitoringService
+from ..dependencies import get_batcher, get_executor, get_prediction_log
+from src.model.batching import BatchingQueue
+from src.model.executor import InferenceExecutor, ExecutorSaturated
+from src.monitoring.prediction_log import PredictionLogSink, prediction_record
 
 router = APIRouter()
+
+BATCH_CHUNK_SIZE = 64
+MAX_BATCH_ITEMS = 10000
+
 model_service = ModelService()
 monitoring_service = MonitoringService()
 
 @router.post("/predict", response_model=CategoryResponse)
-async def predict_category(request: CategoryRequest) -> CategoryResponse:
+async def predict_category(
+    request: CategoryRequest,
+    batcher: BatchingQueue = Depends(get_batcher),
+    prediction_log: Optional[PredictionLogSink] = Depends(get_prediction_log)
+) -> CategoryResponse:
     """
     Predict categories for input data using the trained model.
     """
+    # Bad input is rejected here, since it would fail the whole micro-batch it joined
+    if not isinstance(request.data, str) or not request.data.strip():
+        raise HTTPException(status_code=422, detail="Input must be non-empty text")
+    model_version = batcher.executor.model_version
     try:
-        # Log prediction request
-        monitoring_service.log_prediction_request(request)
+        # Get model predictions, batched with concurrent requests
+        prediction = await batcher.submit(request.data)
         
-        # Get model predictions
-        predictions = model_service.predict(request.data)
-        
-        # Log prediction results
-        monitoring_service.log_prediction_result(predictions)
+        # Queue the request and its result for the database writer
+        if prediction_log is not None:
+            await prediction_log.log(prediction_record(
+                "categorize", request.data, prediction, model_version=model_version
+            ))
         
         return CategoryResponse(
-            categories=predictions["categories"],
-            confidence_scores=predictions["confidence_scores"],
-            model_version=model_service.get_model_version()
+            categories=[prediction["prediction"]],
+            confidence_scores=[prediction["confidence"]],
+            model_version=model_version
         )
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         monitoring_service.log_error(str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/batch-predict")
-async def batch_predict(requests: List[CategoryRequest]) -> List[CategoryResponse]:
+async def batch_predict(
+    requests: List[CategoryRequest],
+    batcher: BatchingQueue = Depends(get_batcher),
+    prediction_log: Optional[PredictionLogSink] = Depends(get_prediction_log)
+) -> StreamingResponse:
     """
     Batch prediction endpoint for multiple data points.
+
+    Items are submitted to the batching queue in chunks, where they share
+    model calls with concurrent requests, and streamed back as NDJSON lines
+    in completion order. Each line carries the item's index and its own
+    status, so one bad item does not fail the whole batch.
     """
+    if len(requests) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_ITEMS} items")
+
+    # The version of the model that actually serves the lines, as /predict reports it
+    model_version = batcher.executor.model_version
+    # A chunk is admitted to the queue whole, so it must fit in it
+    chunk_size = min(BATCH_CHUNK_SIZE, batcher.max_queue_size)
+    chunks = [
+        list(range(start, min(start + chunk_size, len(requests))))
+        for start in range(0, len(requests), chunk_size)
+    ]
+    # Keep at most one chunk per worker in flight so large batches don't trip backpressure
+    slots = asyncio.Semaphore(batcher.executor.max_workers)
+
+    async def run_chunk(indices: List[int]) -> List[Dict[str, Any]]:
+        async with slots:
+            lines = await _predict_chunk(batcher, [requests[i].data for i in indices], indices, model_version)
+        if prediction_log is not None:
+            for line in lines:
+                if line["status"] == "ok":
+                    await prediction_log.log(prediction_record(
+                        "categorize-batch", requests[line["index"]].data, line, model_version=model_version
+                    ))
+        return lines
+
+    async def stream():
+        tasks = [asyncio.create_task(run_chunk(indices)) for indices in chunks]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                lines = await completed
+                yield "".join(json.dumps(line) + "\n" for line in lines)
+        finally:
+            # A client that disconnects closes the stream; stop the chunks nobody will read
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+async def _predict_chunk(batcher: BatchingQueue, texts: List[Any], indices: List[int], model_version: str) -> List[Dict[str, Any]]:
+    """Predict a chunk through the batching queue, falling back to unbatched per-item calls to isolate failures"""
+    results = {}
+    valid = []
+    for index, text in zip(indices, texts):
+        if isinstance(text, str) and text.strip():
+            valid.append((index, text))
+        else:
+            results[index] = _error_line(index, "Input must be non-empty text")
+
+    if not valid:
+        return [results[index] for index in indices]
+
     try:
-        results = []
-        for request in requests:
-            prediction = await predict_category(request)
-            results.append(prediction)
-        return results
+        predictions = await batcher.submit_many([text for _, text in valid])
+        for (index, _), prediction in zip(valid, predictions):
+            results[index] = _result_line(index, prediction, model_version)
+    except ExecutorSaturated as e:
+        for index, _ in valid:
+            results[index] = _error_line(index, str(e), retry_after=e.retry_after)
     except Exception as e:
         monitoring_service.log_error(str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        for index, text in valid:
+            try:
+                prediction = await batcher.executor.run("predict", text)
+                results[index] = _result_line(index, prediction, model_version)
+            except ExecutorSaturated as item_error:
+                results[index] = _error_line(index, str(item_error), retry_after=item_error.retry_after)
+            except Exception as item_error:
+                results[index] = _error_line(index, str(item_error))
+
+    return [results[index] for index in indices]
+
+def _result_line(index: int, prediction: Dict[str, Any], model_version: str) -> Dict[str, Any]:
+    return {
+        "index": index,
+        "status": "ok",
+        "prediction": prediction["prediction"],
+        "confidence": prediction["confidence"],
+        "probabilities": prediction["probabilities"],
+        "model_version": model_version
+    }
+
+def _error_line(index: int, error: str, **extra) -> Dict[str, Any]:
+    return {"index": index, "status": "error", "error": error, **extra}
 
 @router.get("/categories")
-async def get_available_categories() -> Dict[str, Any]:
+async def get_available_categories(executor: InferenceExecutor = Depends(get_executor)) -> Dict[str, Any]:
     """
     Get list of available categories and their descriptions.
     """
@@ -58,7 +162,7 @@ async def get_available_categories() -> Dict[str, Any]:
         return {
             "categories": categories,
             "total": len(categories),
-            "model_version": model_service.get_model_version()
+            "model_version": executor.model_version
         }
     except Exception as e:
         monitoring_service.log_error(str(e))
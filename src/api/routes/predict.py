@@ -1,60 +1,85 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import Dict, Any
-from src.model.predictor import Predictor
+from typing import List, Optional
+from pydantic import BaseModel
+from src.model.batching import BatchingQueue
+from src.model.executor import ExecutorSaturated
 from src.api.middleware.auth import get_current_user
-from src.api.middleware.rate_limit import RateLimiter
-from fastapi import BackgroundTasks
+from src.api.middleware.rate_limit import RateLimiter, get_rate_limiter
+from src.api.dependencies import get_batcher, get_prediction_log
+from src.monitoring.prediction_log import PredictionLogSink, prediction_record
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-class PredictionRequest:
+class PredictionRequest(BaseModel):
     text: str
 
-class PredictionResponse:
+class PredictionResponse(BaseModel):
     prediction: int
     confidence: float
     probabilities: list
 
+class BatchPredictionRequest(BaseModel):
+    texts: List[str]
+
 @router.post("/predict", response_model=PredictionResponse)
 async def predict(
     data: PredictionRequest,
-    background_tasks: BackgroundTasks,
     token: str = Depends(get_current_user),
-    rate_limiter: RateLimiter = Depends(RateLimiter)
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+    batcher: BatchingQueue = Depends(get_batcher),
+    prediction_log: Optional[PredictionLogSink] = Depends(get_prediction_log)
 ):
     """Predict categories for input text"""
+    # Check rate limit before the handler's catch-all turns the 429 into a 500
+    if not await rate_limiter.check_rate_limit(token):
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
     try:
-        # Check rate limit
-        if not await rate_limiter.check_rate_limit(token):
-            raise HTTPException(status_code=429, detail="Rate limit exceeded")
-        
-        # Get predictor instance
-        predictor = Predictor(
-            model_path="models/trained/current/model.pt",
-            model_name="bert-base-uncased",
-            num_classes=5
-        )
-        
         # Make prediction
-        prediction = predictor.predict(data.text)
+        prediction = await batcher.submit(data.text)
         
-        # Log prediction in background
-        background_tasks.add_task(log_prediction, prediction, token)
+        # Queue the prediction for the database writer
+        if prediction_log is not None:
+            await prediction_log.log(prediction_record("predict", data.text, prediction, user_id=token, model_version=batcher.executor.model_version))
         
         return prediction
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         raise HTTPException(status_code=500, detail="Prediction failed")
 
-def log_prediction(prediction: Dict[str, Any], user_id: str):
-    """Log prediction results"""
+@router.post("/batch-predict", response_model=List[PredictionResponse])
+async def batch_predict(
+    data: BatchPredictionRequest,
+    token: str = Depends(get_current_user),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+    batcher: BatchingQueue = Depends(get_batcher),
+    prediction_log: Optional[PredictionLogSink] = Depends(get_prediction_log)
+):
+    """Predict categories for a list of texts"""
+    # Check rate limit
+    if not await rate_limiter.check_rate_limit(token):
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+    # A batch larger than the whole queue could never be admitted, so retrying would not help
+    if len(data.texts) > batcher.max_queue_size:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {batcher.max_queue_size} texts")
     try:
-        # Implement logging logic here
-        logger.info(f"User {user_id} prediction: {prediction}")
+        # Make predictions alongside concurrent requests
+        predictions = await batcher.submit_many(data.texts)
+        
+        # Queue the predictions for the database writer
+        if prediction_log is not None:
+            for text, prediction in zip(data.texts, predictions):
+                await prediction_log.log(prediction_record("batch-predict", text, prediction, user_id=token, model_version=batcher.executor.model_version))
+        
+        return predictions
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
-        logger.error(f"Error logging prediction: {e}")
+        logger.error(f"Batch prediction error: {e}")
+        raise HTTPException(status_code=500, detail="Prediction failed")
 
 if __name__ == "__main__":
     import uvicorn
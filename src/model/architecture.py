@@ -1,14 +1,79 @@
+import json
 import logging
+import mmap
+import threading
+from contextlib import contextmanager
+from typing import Dict, Tuple
 import torch
 import torch.nn as nn
+from torch.nn.modules.module import register_module_parameter_registration_hook
+from safetensors.torch import save_file
 from transformers import AutoModel, AutoConfig
 
+SAFETENSORS_DTYPES = {
+    'F64': torch.float64, 'F32': torch.float32, 'F16': torch.float16, 'BF16': torch.bfloat16,
+    'I64': torch.int64, 'I32': torch.int32, 'I16': torch.int16, 'I8': torch.int8,
+    'U8': torch.uint8, 'BOOL': torch.bool
+}
+
+def read_safetensors(path: str) -> Tuple[Dict[str, torch.Tensor], Dict[str, str]]:
+    """Map a safetensors file into memory and return zero-copy tensors plus the file metadata.
+
+    The mapping is private copy-on-write: pages are shared through the page
+    cache with every other process that maps the same file until a tensor is
+    written to, which inference never does.
+    """
+    with open(path, 'rb') as f:
+        header_size = int.from_bytes(f.read(8), 'little')
+        header = json.loads(f.read(header_size))
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    metadata = header.pop('__metadata__', {})
+    data_start = 8 + header_size
+    tensors = {}
+    for name, info in header.items():
+        dtype = SAFETENSORS_DTYPES[info['dtype']]
+        begin, end = info['data_offsets']
+        if end == begin:
+            tensors[name] = torch.empty(info['shape'], dtype=dtype)
+            continue
+        count = (end - begin) // torch.empty((), dtype=dtype).element_size()
+        tensors[name] = torch.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + begin).view(info['shape'])
+    return tensors, metadata
+
+# Per-thread nesting depth of skip_parameter_init
+_skip_init = threading.local()
+
+def _parameter_on_meta(module: nn.Module, name: str, param: nn.Parameter):
+    """Parameter registration hook that swaps in a meta copy inside skip_parameter_init on this thread"""
+    if param is not None and getattr(_skip_init, 'depth', 0):
+        return type(param)(param.to("meta"), requires_grad=param.requires_grad)
+
+@contextmanager
+def skip_parameter_init():
+    """Create parameters on the meta device so construction neither allocates nor initializes weights.
+
+    Buffers are still created normally, since non-persistent ones (such as
+    position ids) are not part of the saved state dict; a plain
+    ``torch.device("meta")`` context would leave them without values. The
+    registration hook only acts on the thread inside this context, so
+    modules built concurrently elsewhere are unaffected.
+    """
+    handle = register_module_parameter_registration_hook(_parameter_on_meta)
+    _skip_init.depth = getattr(_skip_init, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _skip_init.depth -= 1
+        handle.remove()
+
 class TransformerClassifier(nn.Module):
-    def __init__(self, model_name: str, num_classes: int, dropout_rate: float = 0.1):
+    def __init__(self, model_name: str, num_classes: int, dropout_rate: float = 0.1, pretrained: bool = True, config=None):
         super().__init__()
         self.logger = logging.getLogger(__name__)
-        self.config = AutoConfig.from_pretrained(model_name)
-        self.transformer = AutoModel.from_pretrained(model_name)
+        self.model_name = model_name
+        self.config = config or AutoConfig.from_pretrained(model_name)
+        # Without pretrained weights the encoder is built from its config alone, for loading a fine-tuned checkpoint
+        self.transformer = AutoModel.from_pretrained(model_name) if pretrained else AutoModel.from_config(self.config)
         self.dropout = nn.Dropout(dropout_rate)
         self.classifier = nn.Linear(self.config.hidden_size, num_classes)
         self.logger.info(f"Initialized TransformerClassifier with {model_name}")
@@ -34,9 +99,18 @@ class TransformerClassifier(nn.Module):
             raise
 
     def save(self, path: str):
-        """Save model to file"""
+        """Save model to file; a .safetensors path also records the encoder config"""
         try:
-            torch.save(self.state_dict(), path)
+            if path.endswith(".safetensors"):
+                metadata = {
+                    'model_name': self.model_name,
+                    'num_classes': str(self.classifier.out_features),
+                    'config': self.config.to_json_string()
+                }
+                state_dict = {name: tensor.contiguous() for name, tensor in self.state_dict().items()}
+                save_file(state_dict, path, metadata=metadata)
+            else:
+                torch.save(self.state_dict(), path)
             self.logger.info(f"Model saved to {path}")
         except Exception as e:
             self.logger.error(f"Error saving model: {e}")
@@ -44,10 +118,22 @@ class TransformerClassifier(nn.Module):
 
     @classmethod
     def load(cls, model_name: str, num_classes: int, path: str):
-        """Load model from file"""
+        """Load model from file without fetching pretrained weights, memory-mapping the checkpoint"""
         try:
-            model = cls(model_name, num_classes)
-            model.load_state_dict(torch.load(path))
+            if path.endswith(".safetensors"):
+                state_dict, metadata = read_safetensors(path)
+            else:
+                state_dict, metadata = torch.load(path, map_location="cpu", mmap=True, weights_only=True), {}
+            if 'config' in metadata:
+                config_dict = json.loads(metadata['config'])
+                config = AutoConfig.for_model(config_dict.pop('model_type'), **config_dict)
+            else:
+                config = AutoConfig.from_pretrained(model_name)
+
+            with skip_parameter_init():
+                model = cls(model_name, num_classes, pretrained=False, config=config)
+            # assign=True adopts the mapped tensors as parameters instead of copying into new ones
+            model.load_state_dict(state_dict, assign=True)
             model.eval()
             return model
         except Exception as e:
@@ -0,0 +1,203 @@
+import argparse
+import inspect
+import logging
+import os
+from typing import Dict, Any, List, Optional
+import numpy as np
+import torch
+import torch.nn as nn
+
+BACKENDS = ("torch", "int8", "onnx")
+
+class InferenceBackend:
+    """Runs the classifier forward pass on padded token ids and returns logits"""
+
+    name = "base"
+
+    def __call__(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        raise NotImplementedError
+
+    def memory_bytes(self) -> int:
+        raise NotImplementedError
+
+class TorchBackend(InferenceBackend):
+    """The fp32 PyTorch model as trained"""
+
+    name = "torch"
+
+    def __init__(self, model: nn.Module):
+        self.model = model.eval()
+
+    def __call__(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        with torch.inference_mode():
+            return self.model(input_ids, attention_mask)
+
+    def memory_bytes(self) -> int:
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+class QuantizedBackend(TorchBackend):
+    """PyTorch dynamic quantization: Linear weights stored as int8, activations quantized per batch (CPU only)"""
+
+    name = "int8"
+
+    def __init__(self, model: nn.Module):
+        super().__init__(torch.ao.quantization.quantize_dynamic(model.cpu().eval(), {nn.Linear}, dtype=torch.qint8))
+
+    def memory_bytes(self) -> int:
+        # Packed int8 weights are not parameters; they appear in the state dict as (weight, bias) tuples
+        total = 0
+        for value in self.model.state_dict().values():
+            tensors = value if isinstance(value, tuple) else (value,)
+            total += sum(t.numel() * t.element_size() for t in tensors if isinstance(t, torch.Tensor))
+        return total
+
+class OnnxBackend(InferenceBackend):
+    """An exported ONNX graph executed with ONNX Runtime on CPU"""
+
+    name = "onnx"
+
+    def __init__(self, onnx_path: str, num_threads: Optional[int] = None):
+        import onnxruntime as ort
+
+        if not os.path.exists(onnx_path):
+            raise FileNotFoundError(f"ONNX model not found at {onnx_path}; create it with `python -m src.model.backends export`")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.onnx_path = onnx_path
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=["CPUExecutionProvider"])
+
+    def __call__(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        logits = self.session.run(["logits"], {
+            'input_ids': input_ids.cpu().numpy().astype(np.int64),
+            'attention_mask': attention_mask.cpu().numpy().astype(np.int64)
+        })[0]
+        return torch.from_numpy(logits)
+
+    def memory_bytes(self) -> int:
+        return os.path.getsize(self.onnx_path)
+
+def default_onnx_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ".onnx"
+
+def export_onnx(model: nn.Module, output_path: str, opset_version: int = 17) -> str:
+    """Export a classifier with dynamic batch and sequence axes"""
+    model = model.cpu().eval()
+    input_ids = torch.ones((2, 16), dtype=torch.long)
+    attention_mask = torch.ones_like(input_ids)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    # Newer torch releases default to the dynamo exporter; older ones only have the TorchScript one
+    options = {'dynamo': False} if 'dynamo' in inspect.signature(torch.onnx.export).parameters else {}
+    torch.onnx.export(
+        model,
+        (input_ids, attention_mask),
+        output_path,
+        input_names=['input_ids', 'attention_mask'],
+        output_names=['logits'],
+        dynamic_axes={
+            'input_ids': {0: 'batch', 1: 'sequence'},
+            'attention_mask': {0: 'batch', 1: 'sequence'},
+            'logits': {0: 'batch'}
+        },
+        opset_version=opset_version,
+        **options
+    )
+    logging.getLogger(__name__).info(f"Exported ONNX model to {output_path}")
+    return output_path
+
+def build_backend(kind: str,
+                  model: Optional[nn.Module] = None,
+                  model_path: Optional[str] = None,
+                  onnx_path: Optional[str] = None,
+                  num_threads: Optional[int] = None) -> InferenceBackend:
+    """Create the configured backend; torch and int8 wrap a loaded model, onnx reads the exported graph"""
+    if kind == "torch":
+        return TorchBackend(model)
+    if kind == "int8":
+        return QuantizedBackend(model)
+    if kind == "onnx":
+        return OnnxBackend(onnx_path or default_onnx_path(model_path), num_threads=num_threads)
+    raise ValueError(f"Unknown inference backend: {kind} (expected one of {BACKENDS})")
+
+def compare_backends(reference, candidate, texts: List[str], labels: Optional[List[int]] = None, batch_size: int = 32) -> Dict[str, Any]:
+    """Accuracy parity of a candidate Predictor against a reference Predictor on held-out texts"""
+    reference_results = reference.batch_predict(texts, batch_size=batch_size)
+    candidate_results = candidate.batch_predict(texts, batch_size=batch_size)
+
+    reference_preds = np.array([r['prediction'] for r in reference_results])
+    candidate_preds = np.array([r['prediction'] for r in candidate_results])
+    reference_probs = np.array([r['probabilities'][0] for r in reference_results])
+    candidate_probs = np.array([r['probabilities'][0] for r in candidate_results])
+
+    report = {
+        'reference': reference.backend.name,
+        'candidate': candidate.backend.name,
+        'samples': len(texts),
+        'agreement': float((reference_preds == candidate_preds).mean()),
+        'max_probability_diff': float(np.abs(reference_probs - candidate_probs).max()),
+        'mean_probability_diff': float(np.abs(reference_probs - candidate_probs).mean())
+    }
+    if labels is not None:
+        labels = np.asarray(labels)
+        report['reference_accuracy'] = float((reference_preds == labels).mean())
+        report['candidate_accuracy'] = float((candidate_preds == labels).mean())
+        report['accuracy_delta'] = report['candidate_accuracy'] - report['reference_accuracy']
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or convert a trained classifier, or check backend parity")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Export a checkpoint to ONNX")
+    export.add_argument("--model-path", required=True)
+    export.add_argument("--model-name", default="bert-base-uncased")
+    export.add_argument("--num-classes", type=int, required=True)
+    export.add_argument("--output", help="Defaults to the checkpoint path with an .onnx suffix")
+    export.add_argument("--opset", type=int, default=17)
+
+    convert = commands.add_parser("convert", help="Convert a pickled checkpoint to memory-mappable safetensors")
+    convert.add_argument("--model-path", required=True)
+    convert.add_argument("--model-name", default="bert-base-uncased")
+    convert.add_argument("--num-classes", type=int, required=True)
+    convert.add_argument("--output", help="Defaults to the checkpoint path with a .safetensors suffix")
+
+    parity = commands.add_parser("parity", help="Compare a backend against fp32 on a held-out CSV")
+    parity.add_argument("--model-path", required=True)
+    parity.add_argument("--model-name", default="bert-base-uncased")
+    parity.add_argument("--num-classes", type=int, required=True)
+    parity.add_argument("--backend", choices=BACKENDS[1:], required=True)
+    parity.add_argument("--data", required=True, help="CSV with a text column and an optional integer label column")
+    parity.add_argument("--text-column", default="text")
+    parity.add_argument("--label-column", default="label")
+    parity.add_argument("--limit", type=int, default=5000)
+    parity.add_argument("--min-agreement", type=float, default=0.99)
+    args = parser.parse_args()
+
+    from src.model.architecture import TransformerClassifier
+    from src.model.predictor import Predictor
+
+    if args.command == "export":
+        model = TransformerClassifier.load(args.model_name, args.num_classes, args.model_path)
+        export_onnx(model, args.output or default_onnx_path(args.model_path), opset_version=args.opset)
+        return
+    if args.command == "convert":
+        model = TransformerClassifier.load(args.model_name, args.num_classes, args.model_path)
+        model.save(args.output or os.path.splitext(args.model_path)[0] + ".safetensors")
+        return
+
+    import json
+    import pandas as pd
+    data = pd.read_csv(args.data, nrows=args.limit)
+    labels = data[args.label_column].tolist() if args.label_column in data else None
+    reference = Predictor(args.model_path, args.model_name, args.num_classes, device="cpu", backend="torch")
+    candidate = Predictor(args.model_path, args.model_name, args.num_classes, device="cpu", backend=args.backend)
+    report = compare_backends(reference, candidate, data[args.text_column].fillna('').astype(str).tolist(), labels)
+    print(json.dumps(report, indent=2))
+    if report['agreement'] < args.min_agreement:
+        raise SystemExit(f"Prediction agreement {report['agreement']:.4f} is below {args.min_agreement}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
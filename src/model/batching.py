@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from src.model.predictor import Predictor
+from src.model.executor import InferenceExecutor, ExecutorSaturated
+from src.monitoring.metrics import BATCH_QUEUE_DEPTH, BATCH_SIZE, BATCH_QUEUE_SECONDS
+
+QueueItem = Tuple[str, asyncio.Future, float]
+
+class BatchingQueue:
+    """Collects concurrent prediction requests into batches for a single forward pass"""
+
+    def __init__(self,
+                 executor: InferenceExecutor,
+                 max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0,
+                 max_queue_size: int = 1024,
+                 name: str = "default"):
+        self.logger = logging.getLogger(__name__)
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._inflight = set()
+        self.logger.info(f"Initialized BatchingQueue '{name}' (max_batch_size={max_batch_size}, max_wait_ms={max_wait_ms})")
+
+    async def start(self):
+        """Start the background batching task"""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.executor.max_workers)
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the batching task and fail any requests still waiting"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batching queue stopped"))
+        BATCH_QUEUE_DEPTH.labels(model=self.name).set(0)
+
+    async def submit(self, text: str) -> Dict[str, Any]:
+        """Queue a single text and wait for its prediction"""
+        return (await self.submit_many([text]))[0]
+
+    async def submit_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Queue several texts together and wait for all of their predictions.
+
+        The texts are admitted all at once or not at all, so a request is never
+        rejected after part of it has already been queued and computed.
+        """
+        if self._worker is None:
+            raise RuntimeError("Batching queue is not running")
+        if len(texts) > self.max_queue_size:
+            raise ValueError(f"Cannot queue {len(texts)} texts; the queue holds at most {self.max_queue_size}")
+        if self._queue.qsize() + len(texts) > self.max_queue_size:
+            raise ExecutorSaturated(self.executor.retry_after)
+        loop = asyncio.get_running_loop()
+        enqueued_at = time.perf_counter()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._queue.put_nowait((text, future, enqueued_at))
+            futures.append(future)
+        BATCH_QUEUE_DEPTH.labels(model=self.name).set(self._queue.qsize())
+        return list(await asyncio.gather(*futures))
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _collect(self) -> List[QueueItem]:
+        """Wait for the first item, then gather more until the batch is full or the wait expires"""
+        batch = [await self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                # Past the deadline, still take whatever is already queued rather than dispatching a short batch
+                item = self._queue.get_nowait() if remaining <= 0 else await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            batch.append(item)
+        BATCH_QUEUE_DEPTH.labels(model=self.name).set(self._queue.qsize())
+        return batch
+
+    async def _run(self):
+        while True:
+            # Keep collecting while every worker is busy, so batches grow under load
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[QueueItem]):
+        """Run one batch on the executor and scatter results back to the callers"""
+        try:
+            started = time.perf_counter()
+            for _, _, enqueued_at in batch:
+                BATCH_QUEUE_SECONDS.labels(model=self.name).observe(started - enqueued_at)
+            BATCH_SIZE.labels(model=self.name).observe(len(batch))
+
+            texts = [text for text, _, _ in batch]
+            try:
+                results = await self.executor.run("batch_predict", texts)
+                for (_, future, _), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                self.logger.error(f"Error running batch of {len(batch)}: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+        finally:
+            self._slots.release()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    async def main():
+        spec = {"model_path": "best_model.pt", "model_name": "bert-base-uncased", "num_classes": 5}
+        predictor = Predictor(**spec)
+        executor = InferenceExecutor(spec, predictor=predictor, max_workers=2)
+        batcher = BatchingQueue(executor, max_batch_size=8, max_wait_ms=5)
+        await batcher.start()
+        results = await batcher.submit_many([f"Sample text number {i}" for i in range(20)])
+        print(f"Predictions: {[r['prediction'] for r in results]}")
+        await batcher.stop()
+        executor.shutdown()
+
+    asyncio.run(main())
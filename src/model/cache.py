@@ -0,0 +1,147 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List
+from src.monitoring.metrics import CACHE_HITS, CACHE_MISSES, CACHE_EVICTIONS
+
+def make_cache_key(cleaned_text: str, model_version: str) -> str:
+    """Key a prediction by model version and cleaned text"""
+    return hashlib.sha256(f"{model_version}\0{cleaned_text}".encode('utf-8')).hexdigest()
+
+class PredictionCache:
+    """Interface for prediction caches"""
+    tier = "base"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Dict[str, Any]):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+class LRUCache(PredictionCache):
+    """In-process cache with least-recently-used and TTL eviction"""
+    tier = "memory"
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: Optional[float] = 3600):
+        self.logger = logging.getLogger(__name__)
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.logger.info(f"Initialized LRUCache (max_size={max_size}, ttl_seconds={ttl_seconds})")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                CACHE_MISSES.labels(tier=self.tier).inc()
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                CACHE_EVICTIONS.labels(tier=self.tier, reason="ttl").inc()
+                CACHE_MISSES.labels(tier=self.tier).inc()
+                return None
+            self._entries.move_to_end(key)
+            CACHE_HITS.labels(tier=self.tier).inc()
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                CACHE_EVICTIONS.labels(tier=self.tier, reason="size").inc()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class RedisCache(PredictionCache):
+    """Shared cache tier stored in Redis with a TTL per entry"""
+    tier = "redis"
+
+    def __init__(self, url: str = "redis://localhost:6379/0", ttl_seconds: Optional[int] = 3600, prefix: str = "prediction:"):
+        import redis
+
+        self.logger = logging.getLogger(__name__)
+        self.redis = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.logger.info(f"Initialized RedisCache at {url}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = self.redis.get(self.prefix + key)
+        except Exception as e:
+            self.logger.error(f"Redis cache error: {e}")
+            raw = None
+        if raw is None:
+            CACHE_MISSES.labels(tier=self.tier).inc()
+            return None
+        CACHE_HITS.labels(tier=self.tier).inc()
+        return json.loads(raw)
+
+    def set(self, key: str, value: Dict[str, Any]):
+        try:
+            self.redis.set(self.prefix + key, json.dumps(value), ex=self.ttl_seconds)
+        except Exception as e:
+            self.logger.error(f"Redis cache error: {e}")
+
+    def clear(self):
+        for key in self.redis.scan_iter(match=self.prefix + "*"):
+            self.redis.delete(key)
+
+class TieredCache(PredictionCache):
+    """Checks tiers in order and back-fills faster tiers on a hit"""
+    tier = "tiered"
+
+    def __init__(self, tiers: List[PredictionCache]):
+        self.tiers = tiers
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        for level, cache in enumerate(self.tiers):
+            value = cache.get(key)
+            if value is not None:
+                for faster in self.tiers[:level]:
+                    faster.set(key, value)
+                return value
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        for cache in self.tiers:
+            cache.set(key, value)
+
+    def clear(self):
+        for cache in self.tiers:
+            cache.clear()
+
+def build_cache(config: Optional[Dict[str, Any]]) -> Optional[PredictionCache]:
+    """Build a prediction cache from the serving.cache config section"""
+    if not config or not config.get('enabled', False):
+        return None
+    tiers: List[PredictionCache] = [
+        LRUCache(max_size=config.get('max_size', 10000), ttl_seconds=config.get('ttl_seconds', 3600))
+    ]
+    if config.get('redis_url'):
+        tiers.append(RedisCache(url=config['redis_url'], ttl_seconds=config.get('ttl_seconds', 3600)))
+    return tiers[0] if len(tiers) == 1 else TieredCache(tiers)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    cache = LRUCache(max_size=2, ttl_seconds=60)
+    for text in ["first text", "second text", "third text"]:
+        cache.set(make_cache_key(text, "v1"), {"prediction": 0})
+    print(f"Entries: {len(cache)}, first evicted: {cache.get(make_cache_key('first text', 'v1')) is None}")
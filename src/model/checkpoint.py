@@ -0,0 +1,129 @@
+import glob
+import logging
+import os
+import random
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+import numpy as np
+import torch
+
+CHECKPOINT_PATTERN = re.compile(r"checkpoint-(\d+)\.pt$")
+
+def snapshot(obj: Any) -> Any:
+    """Copy a (nested) state dict to CPU so training can keep mutating the originals"""
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        return {key: snapshot(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(snapshot(value) for value in obj)
+    return obj
+
+def rng_state() -> Dict[str, Any]:
+    """Capture the Python, NumPy and torch random number generator states"""
+    state = {
+        'python': random.getstate(),
+        'numpy': np.random.get_state(),
+        'torch': torch.get_rng_state()
+    }
+    if torch.cuda.is_available():
+        state['cuda'] = torch.cuda.get_rng_state_all()
+    return state
+
+def set_rng_state(state: Dict[str, Any]):
+    """Restore generator states captured with rng_state()"""
+    random.setstate(state['python'])
+    np.random.set_state(state['numpy'])
+    torch.set_rng_state(state['torch'])
+    if 'cuda' in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state['cuda'])
+
+class CheckpointManager:
+    """Writes training checkpoints on a background thread.
+
+    State is snapshotted to CPU on the caller's thread, then serialised by a
+    single writer thread to a temporary file that is renamed into place, so a
+    crash never leaves a torn checkpoint. At most one write is in flight: a new
+    save waits for the previous one. Only the newest ``keep_last`` step
+    checkpoints are kept.
+    """
+
+    def __init__(self, directory: str, keep_last: int = 3, async_write: bool = True):
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        self.keep_last = keep_last
+        self.async_write = async_write
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint-writer") if async_write else None
+        self._pending: Optional[Future] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def checkpoints(self) -> List[str]:
+        """Step checkpoints in the directory, oldest first"""
+        paths = [path for path in glob.glob(os.path.join(self.directory, "checkpoint-*.pt")) if CHECKPOINT_PATTERN.search(path)]
+        return sorted(paths, key=lambda path: int(CHECKPOINT_PATTERN.search(path).group(1)))
+
+    def latest(self) -> Optional[str]:
+        checkpoints = self.checkpoints()
+        return checkpoints[-1] if checkpoints else None
+
+    def save(self, state: Dict[str, Any], step: int) -> str:
+        """Write a training-state checkpoint for the given global step"""
+        path = os.path.join(self.directory, f"checkpoint-{step:08d}.pt")
+        self._submit(snapshot(state), path, prune=True)
+        return path
+
+    def save_weights(self, state_dict: Dict[str, torch.Tensor], path: str):
+        """Write model weights alone, in the format TransformerClassifier.load reads"""
+        self._submit(snapshot(state_dict), path, prune=False)
+
+    def _submit(self, state: Dict[str, Any], path: str, prune: bool):
+        self.wait()
+        if self._writer is None:
+            self._write(state, path, prune)
+        else:
+            self._pending = self._writer.submit(self._write, state, path, prune)
+
+    def _write(self, state: Dict[str, Any], path: str, prune: bool):
+        try:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                torch.save(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            if prune:
+                for stale in self.checkpoints()[:-self.keep_last]:
+                    os.remove(stale)
+            self.logger.info(f"Checkpoint written to {path}")
+        except Exception as e:
+            self.logger.error(f"Error writing checkpoint {path}: {e}")
+            raise
+
+    def wait(self):
+        """Block until the in-flight write, if any, has finished"""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            pending.result()
+
+    def close(self):
+        self.wait()
+        if self._writer is not None:
+            self._writer.shutdown()
+
+    @staticmethod
+    def load(path: str, map_location: str = "cpu") -> Dict[str, Any]:
+        """Read a checkpoint written by save()"""
+        return torch.load(path, map_location=map_location, weights_only=False)
+
+if __name__ == "__main__":
+    import tempfile
+    logging.basicConfig(level=logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = CheckpointManager(directory, keep_last=2)
+        model = torch.nn.Linear(4, 2)
+        for step in (100, 200, 300):
+            manager.save({'model': model.state_dict(), 'step': step, 'rng': rng_state()}, step)
+        manager.close()
+        print(f"Kept checkpoints: {manager.checkpoints()}")
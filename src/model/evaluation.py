@@ -0,0 +1,90 @@
+import logging
+from typing import Dict, Optional
+import torch
+import torch.distributed as dist
+
+class StreamingMetrics:
+    """Classification metrics accumulated batch by batch in a confusion matrix.
+
+    Only the ``num_classes x num_classes`` count matrix is kept, on the same
+    device as the predictions, so memory does not grow with the evaluation set
+    and no per-batch host copies are needed. Accuracy, macro and weighted F1 and
+    per-class precision/recall are all derived from it in ``compute()``.
+    """
+
+    def __init__(self, num_classes: int, device: str = "cpu"):
+        self.logger = logging.getLogger(__name__)
+        self.num_classes = num_classes
+        self.confusion = torch.zeros(num_classes * num_classes, dtype=torch.int64, device=device)
+
+    def reset(self):
+        self.confusion.zero_()
+
+    def update(self, preds: torch.Tensor, labels: torch.Tensor):
+        """Add a batch of predicted and true class ids"""
+        indices = labels.to(self.confusion.device).long() * self.num_classes + preds.to(self.confusion.device).long()
+        self.confusion += torch.bincount(indices.flatten(), minlength=self.num_classes * self.num_classes)
+
+    def update_logits(self, logits: torch.Tensor, labels: torch.Tensor):
+        """Add a batch of logits, taking the arg-max as the prediction"""
+        self.update(torch.argmax(logits, dim=-1), labels)
+
+    def all_reduce(self):
+        """Sum the counts across ranks when running under torch.distributed"""
+        if dist.is_available() and dist.is_initialized():
+            # gloo only reduces CPU tensors
+            confusion = self.confusion.cpu()
+            dist.all_reduce(confusion, op=dist.ReduceOp.SUM)
+            self.confusion.copy_(confusion)
+
+    @property
+    def matrix(self) -> torch.Tensor:
+        """Counts indexed by [true class, predicted class]"""
+        return self.confusion.view(self.num_classes, self.num_classes).cpu()
+
+    def compute(self) -> Dict[str, float]:
+        """Accuracy, weighted F1 (``f1_score``), macro F1 and per-class precision/recall"""
+        confusion = self.matrix.double()
+        true_positives = confusion.diag()
+        support = confusion.sum(dim=1)
+        predicted = confusion.sum(dim=0)
+        total = support.sum().clamp(min=1)
+
+        precision = true_positives / predicted.clamp(min=1)
+        recall = true_positives / support.clamp(min=1)
+        f1 = 2 * precision * recall / (precision + recall).clamp(min=1e-12)
+        # Classes absent from both labels and predictions do not count towards the macro average
+        present = (support + predicted) > 0
+
+        metrics = {
+            'accuracy': (true_positives.sum() / total).item(),
+            'f1_score': ((f1 * support).sum() / total).item(),
+            'macro_f1': f1[present].mean().item() if present.any() else 0.0,
+            'samples': int(support.sum().item())
+        }
+        for i in range(self.num_classes):
+            metrics[f'precision_class_{i}'] = precision[i].item()
+            metrics[f'recall_class_{i}'] = recall[i].item()
+        return metrics
+
+    def compute_metrics(self, eval_pred, compute_result: bool = True) -> Optional[Dict[str, float]]:
+        """``compute_metrics`` hook for a transformers Trainer run with ``batch_eval_metrics=True``"""
+        logits, labels = eval_pred.predictions, eval_pred.label_ids
+        if isinstance(logits, (tuple, list)):
+            logits = logits[0]
+        self.update_logits(torch.as_tensor(logits), torch.as_tensor(labels))
+        if not compute_result:
+            return None
+        metrics = self.compute()
+        self.reset()
+        return metrics
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    metrics = StreamingMetrics(num_classes=3)
+    for _ in range(10):
+        labels = torch.randint(0, 3, (64,))
+        logits = torch.randn(64, 3) + torch.nn.functional.one_hot(labels, 3)
+        metrics.update_logits(logits, labels)
+    print(f"Streaming metrics: {metrics.compute()}")
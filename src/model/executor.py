@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Any, Optional, Callable
+import torch
+from src.model.predictor import Predictor
+from src.model.cache import build_cache
+from src.monitoring.metrics import INFERENCE_REQUEST_SECONDS
+
+# Per-process predictor used by process pool workers
+_worker_predictor: Optional[Predictor] = None
+
+def _init_worker(model_spec: Dict[str, Any], num_threads: Optional[int], cache_config: Optional[Dict[str, Any]]):
+    """Load a private model copy in a process pool worker"""
+    global _worker_predictor
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    _worker_predictor = Predictor(
+        model_path=model_spec['model_path'],
+        model_name=model_spec['model_name'],
+        num_classes=model_spec['num_classes'],
+        device="cpu",
+        cache=build_cache(cache_config),
+        num_threads=num_threads,
+        **Predictor.options_from_spec(model_spec)
+    )
+
+def _call_worker(method: str, *args):
+    return getattr(_worker_predictor, method)(*args)
+
+def _timed(fn: Callable, *args):
+    """Run fn on a worker and report when it started; wall-clock time so it is comparable across processes"""
+    return time.time(), fn(*args)
+
+class ExecutorSaturated(Exception):
+    """Raised when the inference executor has no room for more work"""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Inference queue is full")
+        self.retry_after = retry_after
+
+class InferenceExecutor:
+    """Bounded worker pool that runs blocking model code off the event loop.
+
+    ``num_threads`` pins torch intra-op threads in each process-mode worker.
+    Thread-mode workers share the process-wide torch setting, which the
+    application sets once at startup, so it is not changed here.
+    """
+
+    def __init__(self,
+                 model_spec: Dict[str, Any],
+                 predictor: Optional[Predictor] = None,
+                 mode: str = "thread",
+                 max_workers: int = 1,
+                 max_pending: int = 64,
+                 num_threads: Optional[int] = None,
+                 retry_after: int = 1,
+                 cache_config: Optional[Dict[str, Any]] = None,
+                 name: str = "default"):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.predictor = predictor
+        # Process workers load their own copies, which report the version derived from the same spec
+        if predictor is not None:
+            self.model_version = predictor.model_version
+        else:
+            options = Predictor.options_from_spec(model_spec)
+            self.model_version = Predictor.version_for(
+                model_spec['model_path'], model_spec['model_name'],
+                options['backend'], options['truncation'], options['max_length']
+            )
+        self._pending = 0
+        self._pool = self._create_pool(model_spec, num_threads, cache_config)
+        self.logger.info(f"Initialized InferenceExecutor ({mode}, max_workers={max_workers}, max_pending={max_pending})")
+
+    def _create_pool(self, model_spec: Dict[str, Any], num_threads: Optional[int], cache_config: Optional[Dict[str, Any]]) -> Executor:
+        if self.mode == "thread":
+            if self.predictor is None:
+                raise ValueError("Thread mode requires a shared predictor")
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        if self.mode == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_spec, num_threads, cache_config)
+            )
+        raise ValueError(f"Unknown executor mode: {self.mode}")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def saturated(self) -> bool:
+        return self._pending >= self.max_pending
+
+    async def submit(self, fn: Callable, *args) -> Any:
+        """Run a callable on the pool, rejecting it when the pool is saturated"""
+        if self.saturated:
+            raise ExecutorSaturated(self.retry_after)
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            queued_at = time.time()
+            started_at, result = await loop.run_in_executor(self._pool, partial(_timed, fn, *args))
+            INFERENCE_REQUEST_SECONDS.labels(model=self.name, phase="queue").observe(max(0.0, started_at - queued_at))
+            INFERENCE_REQUEST_SECONDS.labels(model=self.name, phase="compute").observe(time.time() - started_at)
+            return result
+        finally:
+            self._pending -= 1
+
+    async def run(self, method: str, *args) -> Any:
+        """Call a Predictor method on the worker's model copy"""
+        if self.mode == "process":
+            return await self.submit(_call_worker, method, *args)
+        return await self.submit(getattr(self.predictor, method), *args)
+
+    def shutdown(self, wait: bool = True):
+        """Stop all workers"""
+        self._pool.shutdown(wait=wait)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    async def main():
+        spec = {"model_path": "best_model.pt", "model_name": "bert-base-uncased", "num_classes": 5}
+        executor = InferenceExecutor(spec, mode="process", max_workers=2, num_threads=2)
+        results = await asyncio.gather(*(executor.run("predict", f"Sample text {i}") for i in range(4)))
+        print(f"Predictions: {[r['prediction'] for r in results]}")
+        executor.shutdown()
+
+    asyncio.run(main())
@@ -1,17 +1,83 @@
+import os
 import logging
+import time
+from contextlib import contextmanager
 import torch
-from typing import Dict, Any, List
+from torch.profiler import record_function
+from typing import Dict, Any, List, Optional, Tuple
 from transformers import AutoTokenizer
 from src.preprocessing.text_cleaner import TextCleaner
+from src.preprocessing.truncation import encode_segments
+from src.model.cache import PredictionCache, make_cache_key
+from src.model.backends import build_backend
+from src.monitoring.metrics import INFERENCE_STAGE_SECONDS, batch_size_bucket
+from src.monitoring.profiling import TraceSampler
 
 class Predictor:
-    def __init__(self, model_path: str, model_name: str, num_classes: int, device: str = "cuda" if torch.cuda.is_available() else "cpu"):
+    def __init__(self,
+                 model_path: str,
+                 model_name: str,
+                 num_classes: int,
+                 device: str = "cuda" if torch.cuda.is_available() else "cpu",
+                 cache: Optional[PredictionCache] = None,
+                 model_version: Optional[str] = None,
+                 backend: str = "torch",
+                 onnx_path: Optional[str] = None,
+                 num_threads: Optional[int] = None,
+                 max_length: int = 512,
+                 truncation: str = "head",
+                 window_stride: Optional[int] = None):
         self.logger = logging.getLogger(__name__)
-        self.device = device
-        self.model = self._load_model(model_path, model_name, num_classes)
+        # The int8 and ONNX Runtime backends only run on CPU
+        self.device = device if backend == "torch" else "cpu"
+        # The ONNX backend runs the exported graph, so the PyTorch model is not kept in memory
+        self.model = self._load_model(model_path, model_name, num_classes) if backend != "onnx" else None
+        self.backend = build_backend(backend, model=self.model, model_path=model_path, onnx_path=onnx_path, num_threads=num_threads)
+        if backend == "int8":
+            self.model = self.backend.model
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.text_cleaner = TextCleaner()
-        self.logger.info(f"Initialized Predictor on device: {device}")
+        self.max_length = max_length
+        self.truncation = truncation
+        self.window_stride = window_stride
+        self.cache = cache
+        # Set to a TraceSampler to allow on-demand torch.profiler captures
+        self.profiler: Optional[TraceSampler] = None
+        # Backends and truncation settings change the probabilities, so they do not share cache entries
+        self.model_version = model_version or self.version_for(model_path, model_name, backend, truncation, max_length)
+        self.logger.info(f"Initialized Predictor on device: {self.device} with {backend} backend, {truncation} truncation at {max_length} tokens")
+
+    @staticmethod
+    def options_from_spec(model_spec: Dict[str, Any]) -> Dict[str, Any]:
+        """Predictor keyword arguments from a serving.models entry"""
+        return {
+            'backend': model_spec.get('backend', 'torch'),
+            'onnx_path': model_spec.get('onnx_path'),
+            'max_length': model_spec.get('max_length', 512),
+            'truncation': model_spec.get('truncation', 'head'),
+            'window_stride': model_spec.get('window_stride')
+        }
+
+    @contextmanager
+    def _stage(self, stage: str, batch_size: int):
+        """Time a pipeline stage into inference_stage_seconds and mark it in profiler traces"""
+        start = time.perf_counter()
+        with record_function(stage):
+            yield
+        INFERENCE_STAGE_SECONDS.labels(
+            stage=stage, model_version=self.model_version, batch_size=batch_size_bucket(batch_size)
+        ).observe(time.perf_counter() - start)
+
+    @staticmethod
+    def version_for(model_path: str, model_name: str, backend: str = "torch", truncation: str = "head", max_length: int = 512) -> str:
+        """Model version a Predictor built with these settings reports"""
+        return f"{Predictor._checkpoint_version(model_path, model_name)}:{backend}:{truncation}{max_length}"
+
+    @staticmethod
+    def _checkpoint_version(model_path: str, model_name: str) -> str:
+        """Derive a version from the checkpoint file so a replaced checkpoint gets fresh cache keys"""
+        stat = os.stat(model_path)
+        return f"{model_name}:{os.path.abspath(model_path)}:{stat.st_size}:{stat.st_mtime_ns}"
 
     def _load_model(self, model_path: str, model_name: str, num_classes: int):
         """Load trained model"""
@@ -26,49 +92,134 @@ class Predictor:
             raise
 
     def preprocess_text(self, text: str) -> Dict[str, torch.Tensor]:
-        """Preprocess text for prediction"""
+        """Preprocess text for prediction; sliding windows yield one row per window"""
         try:
             # Clean text
-            cleaned_text = self.text_cleaner.clean_text(text)
-            
+            cleaned_text = self.text_cleaner.clean_text(text) or ''
+
             # Tokenize
-            encoding = self.tokenizer(
-                cleaned_text,
-                max_length=512,
-                padding='max_length',
-                truncation=True,
+            segments, _ = self._tokenize_cleaned([cleaned_text])
+            return self.pad_batch(segments)
+        except Exception as e:
+            self.logger.error(f"Error preprocessing text: {e}")
+            raise
+
+    def predict(self, text: str) -> Dict[str, Any]:
+        """Make prediction for a single text"""
+        return self.batch_predict([text])[0]
+
+    def tokenize_batch(self, texts: List[str]) -> List[List[int]]:
+        """Clean and tokenize a list of texts into model inputs without padding (several per text with sliding windows)"""
+        return self._tokenize_cleaned([self.text_cleaner.clean_text(text) or '' for text in texts])[0]
+
+    def _tokenize_cleaned(self, cleaned_texts: List[str]) -> Tuple[List[List[int]], List[int]]:
+        """Token id segments and, for each segment, the index of its text"""
+        try:
+            return encode_segments(
+                self.tokenizer,
+                cleaned_texts,
+                max_length=self.max_length,
+                strategy=self.truncation,
+                stride=self.window_stride
+            )
+        except Exception as e:
+            self.logger.error(f"Error tokenizing batch: {e}")
+            raise
+
+    def pad_batch(self, input_ids: List[List[int]]) -> Dict[str, torch.Tensor]:
+        """Pad token ids to the longest sequence in the batch"""
+        with self._stage("pad", len(input_ids)):
+            encoding = self.tokenizer.pad(
+                {'input_ids': input_ids},
+                padding='longest',
+                return_attention_mask=True,
                 return_tensors='pt'
             )
-            
+        with self._stage("host_to_device", len(input_ids)):
             return {
                 'input_ids': encoding['input_ids'].to(self.device),
                 'attention_mask': encoding['attention_mask'].to(self.device)
             }
-        except Exception as e:
-            self.logger.error(f"Error preprocessing text: {e}")
-            raise
 
-    def predict(self, text: str) -> Dict[str, Any]:
-        """Make prediction for a single text"""
+    def batch_predict(self, texts: List[str], batch_size: int = 32) -> List[Dict[str, Any]]:
+        """Make predictions for a list of texts, batching inputs of similar token length"""
+        if not texts:
+            return []
+        if self.profiler is not None and self.profiler.armed:
+            with self.profiler.capture(len(texts)):
+                return self._batch_predict(texts, batch_size)
+        return self._batch_predict(texts, batch_size)
+
+    def _batch_predict(self, texts: List[str], batch_size: int) -> List[Dict[str, Any]]:
         try:
-            with torch.no_grad():
-                inputs = self.preprocess_text(text)
-                outputs = self.model(**inputs)
-                probs = torch.softmax(outputs, dim=1)
-                pred = torch.argmax(probs, dim=1)
-                
-                return {
-                    'prediction': pred.item(),
-                    'confidence': probs.max().item(),
-                    'probabilities': probs.cpu().numpy().tolist()
-                }
+            with self._stage("clean", len(texts)):
+                cleaned_texts = [self.text_cleaner.clean_text(text) or '' for text in texts]
+            results: List[Dict[str, Any]] = [None] * len(texts)
+
+            # Texts that clean to the same string share one prediction
+            positions: Dict[str, List[int]] = {}
+            for i, cleaned in enumerate(cleaned_texts):
+                positions.setdefault(cleaned, []).append(i)
+
+            unique_texts = []
+            for cleaned, indices in positions.items():
+                cached = self.cache.get(make_cache_key(cleaned, self.model_version)) if self.cache else None
+                if cached is None:
+                    unique_texts.append(cleaned)
+                else:
+                    for i in indices:
+                        results[i] = dict(cached)
+
+            if unique_texts:
+                predictions = self._predict_cleaned(unique_texts, batch_size)
+                for cleaned, prediction in zip(unique_texts, predictions):
+                    if self.cache:
+                        self.cache.set(make_cache_key(cleaned, self.model_version), prediction)
+                    for i in positions[cleaned]:
+                        results[i] = dict(prediction)
+            return results
         except Exception as e:
-            self.logger.error(f"Error making prediction: {e}")
+            self.logger.error(f"Error making batch prediction: {e}")
             raise
 
-    def batch_predict(self, texts: List[str]) -> List[Dict[str, Any]]:
-        """Make predictions for a batch of texts"""
-        return [self.predict(text) for text in texts]
+    def _predict_cleaned(self, cleaned_texts: List[str], batch_size: int) -> List[Dict[str, Any]]:
+        with self._stage("tokenize", len(cleaned_texts)):
+            input_ids, owners = self._tokenize_cleaned(cleaned_texts)
+
+        # Sort segments by length so each batch is padded only to a similar length;
+        # windows of long texts are batched alongside every other segment
+        order = sorted(range(len(input_ids)), key=lambda i: len(input_ids[i]))
+        logits = [None] * len(input_ids)
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            inputs = self.pad_batch([input_ids[i] for i in indices])
+            with self._stage("forward", len(indices)):
+                outputs = self.backend(**inputs)
+                if outputs.is_cuda:
+                    # Kernels run asynchronously; wait so the time is the forward pass, not the launch
+                    torch.cuda.synchronize(outputs.device)
+            with self._stage("device_to_host", len(indices)):
+                outputs = outputs.float().cpu()
+            for row, i in enumerate(indices):
+                logits[i] = outputs[row]
+
+        # Average the logits of each text's segments, then restore the caller's order
+        with self._stage("softmax", len(cleaned_texts)):
+            segment_logits = torch.stack(logits)
+            owner_index = torch.tensor(owners)
+            pooled = torch.zeros((len(cleaned_texts), segment_logits.size(1))).index_add_(0, owner_index, segment_logits)
+            pooled /= torch.bincount(owner_index, minlength=len(cleaned_texts)).unsqueeze(1)
+            probs = torch.softmax(pooled, dim=1)
+            confidences, preds = probs.max(dim=1)
+        with self._stage("tolist", len(cleaned_texts)):
+            return [
+                {
+                    'prediction': preds[i].item(),
+                    'confidence': confidences[i].item(),
+                    'probabilities': probs[i:i + 1].numpy().tolist()
+                }
+                for i in range(len(cleaned_texts))
+            ]
 
 if __name__ == "__main__":
     import sys
@@ -0,0 +1,89 @@
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from src.model.predictor import Predictor
+from src.model.cache import PredictionCache
+from src.monitoring.metrics import MODEL_LOAD_SECONDS, MODEL_MEMORY_BYTES
+
+ModelKey = Tuple[str, str, int, Tuple[Tuple[str, Any], ...]]
+
+class ModelRegistry:
+    """Process-wide store of loaded predictors, keyed by (model_path, model_name, num_classes) and Predictor options"""
+
+    def __init__(self, device: str = None, cache: Optional[PredictionCache] = None):
+        self.logger = logging.getLogger(__name__)
+        self.device = device
+        self.cache = cache
+        self._predictors: Dict[ModelKey, Predictor] = {}
+        self._stats: Dict[ModelKey, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.logger.info("Model registry initialized")
+
+    @staticmethod
+    def _key(model_path: str, model_name: str, num_classes: int, options: Dict[str, Any]) -> ModelKey:
+        return (model_path, model_name, num_classes, tuple(sorted(options.items())))
+
+    def load(self, model_path: str, model_name: str, num_classes: int, num_threads: Optional[int] = None, **options) -> Predictor:
+        """Load a predictor once and return the shared instance; options are passed to Predictor"""
+        key = self._key(model_path, model_name, num_classes, options)
+        with self._lock:
+            if key in self._predictors:
+                return self._predictors[key]
+            try:
+                start = time.perf_counter()
+                kwargs = {'device': self.device} if self.device else {}
+                predictor = Predictor(
+                    model_path=model_path,
+                    model_name=model_name,
+                    num_classes=num_classes,
+                    cache=self.cache,
+                    num_threads=num_threads,
+                    **options,
+                    **kwargs
+                )
+                load_seconds = time.perf_counter() - start
+                memory_bytes = predictor.backend.memory_bytes()
+
+                self._predictors[key] = predictor
+                self._stats[key] = {
+                    'model_path': model_path,
+                    'model_name': model_name,
+                    'num_classes': num_classes,
+                    **options,
+                    'model_version': predictor.model_version,
+                    'load_seconds': load_seconds,
+                    'memory_bytes': memory_bytes
+                }
+                MODEL_LOAD_SECONDS.labels(model=model_path).set(load_seconds)
+                MODEL_MEMORY_BYTES.labels(model=model_path).set(memory_bytes)
+                self.logger.info(f"Loaded {model_name} from {model_path} in {load_seconds:.2f}s ({memory_bytes / 2**20:.1f} MiB)")
+                return predictor
+            except Exception as e:
+                self.logger.error(f"Error loading model into registry: {e}")
+                raise
+
+    def get(self, model_path: str, model_name: str, num_classes: int, **options) -> Predictor:
+        """Return a previously loaded predictor"""
+        key = self._key(model_path, model_name, num_classes, options)
+        try:
+            return self._predictors[key]
+        except KeyError:
+            raise KeyError(f"Model not loaded: {key}")
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Load time and memory footprint of every loaded model"""
+        return list(self._stats.values())
+
+    def clear(self):
+        """Drop all loaded predictors"""
+        with self._lock:
+            self._predictors.clear()
+            self._stats.clear()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    registry = ModelRegistry()
+    registry.load("best_model.pt", "bert-base-uncased", 5)
+    print(f"Loaded models: {registry.stats()}")
@@ -1,131 +1,366 @@
 import logging
+import itertools
+import math
+import random
+import time
+from contextlib import nullcontext
 import torch
-from torch.utils.data import DataLoader
+import torch.distributed as dist
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data import DataLoader, Subset
+from torch.utils.data.distributed import DistributedSampler
 from torch.optim import AdamW
 from torch.nn import CrossEntropyLoss
 from transformers import get_linear_schedule_with_warmup
 from tqdm import tqdm
-from sklearn.metrics import accuracy_score, f1_score
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+from src.model.checkpoint import CheckpointManager, rng_state, set_rng_state
+from src.model.evaluation import StreamingMetrics
+from src.preprocessing.tokenized_dataset import LengthBucketSampler
+
+PRECISIONS = {"fp32": None, "bf16": torch.bfloat16}
 
 class ModelTrainer:
-    def __init__(self, model, device: str = "cuda" if torch.cuda.is_available() else "cpu"):
+    def __init__(self, model, device: str = "cuda" if torch.cuda.is_available() else "cpu", distributed: bool = False):
         self.logger = logging.getLogger(__name__)
         self.model = model.to(device)
         self.device = device
-        self.logger.info(f"Initialized ModelTrainer on device: {device}")
+        self.distributed = distributed
+        self.rank = 0
+        self.world_size = 1
+        if distributed:
+            # Rendezvous settings come from the environment set by torchrun
+            if not dist.is_initialized():
+                dist.init_process_group(backend="gloo")
+            self.rank = dist.get_rank()
+            self.world_size = dist.get_world_size()
+            # The encoder's pooler is never used by the classifier head, so its parameters get no gradient
+            self.forward_model = DistributedDataParallel(self.model, find_unused_parameters=True)
+        else:
+            self.forward_model = self.model
+        self.logger.info(f"Initialized ModelTrainer on device: {device} (rank {self.rank}/{self.world_size})")
+
+    @property
+    def is_main_process(self) -> bool:
+        return self.rank == 0
+
+    def distribute_loader(self, loader: DataLoader, shuffle: bool) -> DataLoader:
+        """Rebuild a DataLoader so each rank reads its own shard of the dataset"""
+        if not self.distributed:
+            return loader
+        common = {
+            'num_workers': loader.num_workers,
+            'collate_fn': loader.collate_fn,
+            'pin_memory': loader.pin_memory,
+            'persistent_workers': loader.num_workers > 0
+        }
+        if isinstance(loader.batch_sampler, LengthBucketSampler):
+            bucket_sampler = loader.batch_sampler
+            batch_sampler = LengthBucketSampler(
+                bucket_sampler.lengths,
+                bucket_sampler.batch_size,
+                shuffle=shuffle,
+                seed=bucket_sampler.seed,
+                num_replicas=self.world_size,
+                rank=self.rank
+            )
+            return DataLoader(loader.dataset, batch_sampler=batch_sampler, **common)
+        sampler = DistributedSampler(loader.dataset, num_replicas=self.world_size, rank=self.rank, shuffle=shuffle)
+        return DataLoader(loader.dataset, batch_size=loader.batch_size, sampler=sampler, drop_last=loader.drop_last, **common)
+
+    def _all_reduce(self, tensor: torch.Tensor) -> torch.Tensor:
+        """Sum a tensor across ranks"""
+        if self.distributed:
+            dist.all_reduce(tensor, op=dist.ReduceOp.SUM)
+        return tensor
 
-    def train(self, 
-              train_loader: DataLoader, 
-              val_loader: DataLoader, 
-              epochs: int = 5, 
+    def _autocast(self, precision: str):
+        """Autocast context for the requested precision; a no-op for fp32"""
+        dtype = PRECISIONS[precision]
+        device_type = "cuda" if str(self.device).startswith("cuda") else "cpu"
+        return torch.autocast(device_type=device_type, dtype=dtype, enabled=dtype is not None)
+
+    @staticmethod
+    def _trim_padding(batch: Dict[str, torch.Tensor]) -> Dict[str, torch.Tensor]:
+        """Drop padding columns beyond the longest sequence in the batch"""
+        length = int(batch['attention_mask'].sum(dim=1).max())
+        return {
+            **batch,
+            'input_ids': batch['input_ids'][:, :length],
+            'attention_mask': batch['attention_mask'][:, :length]
+        }
+
+    def train(self,
+              train_loader: DataLoader,
+              val_loader: DataLoader,
+              epochs: int = 5,
               learning_rate: float = 2e-5,
-              warmup_steps: int = 1000) -> Dict[str, Any]:
-        """Train the model"""
+              warmup_steps: int = 1000,
+              precision: str = "fp32",
+              gradient_accumulation_steps: int = 1,
+              compile_model: bool = False,
+              trim_padding: bool = True,
+              progress: bool = True,
+              checkpoint_dir: Optional[str] = None,
+              checkpoint_every: Optional[int] = None,
+              keep_checkpoints: int = 3,
+              resume_from: Optional[str] = None,
+              eval_every: Optional[int] = None,
+              eval_samples: int = 2000) -> Dict[str, Any]:
+        """Train the model, optionally checkpointing every N optimizer steps and resuming from a checkpoint"""
+        # Only rank 0 writes; best_model.pt keeps going to the working directory
+        checkpoints = CheckpointManager(checkpoint_dir or ".", keep_last=keep_checkpoints) if self.is_main_process else None
         try:
+            if precision not in PRECISIONS:
+                raise ValueError(f"Unsupported precision: {precision}")
+            if compile_model:
+                self.forward_model = torch.compile(self.forward_model)
+            train_loader = self.distribute_loader(train_loader, shuffle=True)
+            # Mid-epoch evaluation runs on a fixed random subset of the validation set
+            subset_loader = self.distribute_loader(self.subsample_loader(val_loader, eval_samples), shuffle=False) if eval_every else None
+            val_loader = self.distribute_loader(val_loader, shuffle=False)
+
             # Initialize optimizer and scheduler
             optimizer = AdamW(self.model.parameters(), lr=learning_rate)
-            total_steps = len(train_loader) * epochs
+            steps_per_epoch = math.ceil(len(train_loader) / gradient_accumulation_steps)
+            total_steps = steps_per_epoch * epochs
             scheduler = get_linear_schedule_with_warmup(
-                optimizer, 
+                optimizer,
                 num_warmup_steps=warmup_steps,
                 num_training_steps=total_steps
             )
-            
+
             # Loss function
             criterion = CrossEntropyLoss()
-            
+
             # Training loop
             best_val_accuracy = 0
             training_history = []
-            
-            for epoch in range(epochs):
+            eval_history = []
+            start_epoch, start_batch, global_step = 0, 0, 0
+            resume_state = None
+
+            if resume_from == "latest":
+                resume_from = CheckpointManager(checkpoint_dir).latest() if checkpoint_dir else None
+            if resume_from:
+                resume_state = CheckpointManager.load(resume_from)
+                self.model.load_state_dict(resume_state['model'])
+                optimizer.load_state_dict(resume_state['optimizer'])
+                scheduler.load_state_dict(resume_state['scheduler'])
+                start_epoch = resume_state['epoch']
+                start_batch = resume_state['batch']
+                global_step = resume_state['global_step']
+                best_val_accuracy = resume_state['best_val_accuracy']
+                training_history = resume_state['training_history']
+                self.logger.info(f"Resuming from {resume_from} at epoch {start_epoch + 1}, batch {start_batch}")
+
+            for epoch in range(start_epoch, epochs):
+                sampler = train_loader.batch_sampler if isinstance(train_loader.batch_sampler, LengthBucketSampler) else train_loader.sampler
+                if hasattr(sampler, 'set_epoch'):
+                    sampler.set_epoch(epoch)
                 self.model.train()
                 epoch_loss = 0
-                
+                epoch_samples = 0
+                epoch_tokens = 0
+                epoch_start = time.perf_counter()
+                optimizer.zero_grad()
+
+                # The generator state at the start of the epoch fixes the shuffle order, so a
+                # mid-epoch resume replays it, skips the batches already trained on, and then
+                # restores the state saved with the checkpoint
+                skip = start_batch if resume_state is not None and epoch == start_epoch else 0
+                if skip:
+                    epoch_rng = resume_state['epoch_rng']
+                    set_rng_state(epoch_rng)
+                else:
+                    epoch_rng = rng_state()
+                batch_iterator = iter(train_loader)
+                if skip:
+                    for _ in range(skip):
+                        next(batch_iterator)
+                    set_rng_state(resume_state['rng'])
+                    epoch_loss, epoch_samples, epoch_tokens, elapsed = resume_state['epoch_totals']
+                    epoch_start -= elapsed
+
                 # Training phase
-                for batch in tqdm(train_loader, desc=f"Epoch {epoch + 1}/{epochs}"):
-                    optimizer.zero_grad()
-                    
+                batches = tqdm(
+                    batch_iterator,
+                    desc=f"Epoch {epoch + 1}/{epochs}",
+                    initial=skip,
+                    total=len(train_loader),
+                    mininterval=1.0,
+                    disable=not (progress and self.is_main_process)
+                )
+                for step, batch in enumerate(batches, start=skip):
+                    if trim_padding:
+                        batch = self._trim_padding(batch)
+
                     # Move data to device
                     input_ids = batch['input_ids'].to(self.device)
                     attention_mask = batch['attention_mask'].to(self.device)
                     labels = batch['labels'].to(self.device)
-                    
-                    # Forward pass
-                    outputs = self.model(input_ids, attention_mask)
-                    loss = criterion(outputs, labels)
-                    
-                    # Backward pass
-                    loss.backward()
-                    optimizer.step()
-                    scheduler.step()
-                    
+
+                    # Gradients are only synchronised across ranks on the last micro-batch of a window
+                    sync_step = (step + 1) % gradient_accumulation_steps == 0 or step + 1 == len(train_loader)
+                    no_sync = self.forward_model.no_sync if self.distributed and not sync_step else nullcontext
+                    # The epoch's last window may be shorter; average over the micro-batches it actually holds
+                    window_size = min(gradient_accumulation_steps, len(train_loader) - step // gradient_accumulation_steps * gradient_accumulation_steps)
+
+                    # Forward and backward pass, stepping once per accumulation window
+                    with no_sync():
+                        with self._autocast(precision):
+                            outputs = self.forward_model(input_ids, attention_mask)
+                            loss = criterion(outputs.float(), labels)
+                        (loss / window_size).backward()
+                    if sync_step:
+                        optimizer.step()
+                        scheduler.step()
+                        optimizer.zero_grad()
+                        global_step += 1
+
                     epoch_loss += loss.item()
-                
+                    epoch_samples += labels.size(0)
+                    epoch_tokens += int(attention_mask.sum())
+
+                    if eval_every and sync_step and global_step % eval_every == 0:
+                        step_metrics = {
+                            'epoch': epoch + 1,
+                            'global_step': global_step,
+                            **self.evaluate(subset_loader, precision=precision, trim_padding=trim_padding)
+                        }
+                        eval_history.append(step_metrics)
+                        if self.is_main_process:
+                            self.logger.info(f"Step {global_step} subset metrics: {step_metrics}")
+
+                    # The last batch of an epoch is covered by the end-of-epoch checkpoint
+                    if (checkpoints is not None and checkpoint_dir and checkpoint_every and sync_step
+                            and global_step % checkpoint_every == 0 and step + 1 < len(train_loader)):
+                        checkpoints.save(self._training_state(
+                            optimizer, scheduler, epoch, step + 1, global_step, best_val_accuracy, training_history,
+                            epoch_rng=epoch_rng,
+                            epoch_totals=(epoch_loss, epoch_samples, epoch_tokens, time.perf_counter() - epoch_start)
+                        ), global_step)
+
+                epoch_seconds = time.perf_counter() - epoch_start
+
+                # Combine loss and throughput counts from every rank
+                totals = self._all_reduce(torch.tensor([epoch_loss, len(train_loader), epoch_samples, epoch_tokens], dtype=torch.float64))
+                epoch_seconds = self._all_reduce(torch.tensor([epoch_seconds], dtype=torch.float64)).item() / self.world_size
+
                 # Validation phase
-                val_metrics = self.evaluate(val_loader)
-                
+                val_metrics = self.evaluate(val_loader, precision=precision, trim_padding=trim_padding)
+
                 # Save best model
                 if val_metrics['accuracy'] > best_val_accuracy:
                     best_val_accuracy = val_metrics['accuracy']
-                    self.model.save("best_model.pt")
-                
+                    if checkpoints is not None:
+                        checkpoints.save_weights(self.model.state_dict(), "best_model.pt")
+
                 # Log metrics
                 epoch_metrics = {
                     'epoch': epoch + 1,
-                    'train_loss': epoch_loss / len(train_loader),
+                    'train_loss': (totals[0] / totals[1]).item(),
+                    'train_seconds': epoch_seconds,
+                    'samples_per_sec': totals[2].item() / epoch_seconds,
+                    'tokens_per_sec': totals[3].item() / epoch_seconds,
                     **val_metrics
                 }
                 training_history.append(epoch_metrics)
-                self.logger.info(f"Epoch {epoch + 1} metrics: {epoch_metrics}")
-            
+                if self.is_main_process:
+                    self.logger.info(f"Epoch {epoch + 1} metrics: {epoch_metrics}")
+
+                if checkpoints is not None and checkpoint_dir:
+                    checkpoints.save(self._training_state(
+                        optimizer, scheduler, epoch + 1, 0, global_step, best_val_accuracy, training_history
+                    ), global_step)
+
             return {
                 'training_history': training_history,
+                'eval_history': eval_history,
                 'best_val_accuracy': best_val_accuracy
             }
         except Exception as e:
             self.logger.error(f"Error during training: {e}")
             raise
+        finally:
+            if checkpoints is not None:
+                checkpoints.close()
+
+    def _training_state(self,
+                        optimizer,
+                        scheduler,
+                        epoch: int,
+                        batch: int,
+                        global_step: int,
+                        best_val_accuracy: float,
+                        training_history: List[Dict[str, Any]],
+                        epoch_rng: Optional[Dict[str, Any]] = None,
+                        epoch_totals: Tuple[float, int, int, float] = (0.0, 0, 0, 0.0)) -> Dict[str, Any]:
+        """Everything needed to continue training from the given epoch and batch"""
+        return {
+            'model': self.model.state_dict(),
+            'optimizer': optimizer.state_dict(),
+            'scheduler': scheduler.state_dict(),
+            'rng': rng_state(),
+            'epoch_rng': epoch_rng,
+            'epoch': epoch,
+            'batch': batch,
+            'global_step': global_step,
+            'epoch_totals': epoch_totals,
+            'best_val_accuracy': best_val_accuracy,
+            'training_history': list(training_history)
+        }
 
-    def evaluate(self, data_loader: DataLoader) -> Dict[str, float]:
-        """Evaluate model performance"""
+    def evaluate(self,
+                 data_loader: DataLoader,
+                 precision: str = "fp32",
+                 trim_padding: bool = True,
+                 max_batches: Optional[int] = None) -> Dict[str, float]:
+        """Evaluate model performance with streaming metrics combined across ranks"""
+        was_training = self.model.training
         self.model.eval()
-        all_preds = []
-        all_labels = []
-        
-        with torch.no_grad():
-            for batch in data_loader:
+        metrics = StreamingMetrics(self.model.classifier.out_features, device=self.device)
+
+        with torch.no_grad(), self._autocast(precision):
+            for batch in itertools.islice(data_loader, max_batches):
+                if trim_padding:
+                    batch = self._trim_padding(batch)
                 input_ids = batch['input_ids'].to(self.device)
                 attention_mask = batch['attention_mask'].to(self.device)
                 labels = batch['labels'].to(self.device)
-                
-                outputs = self.model(input_ids, attention_mask)
-                preds = torch.argmax(outputs, dim=1)
-                
-                all_preds.extend(preds.cpu().numpy())
-                all_labels.extend(labels.cpu().numpy())
-        
-        return {
-            'accuracy': accuracy_score(all_labels, all_preds),
-            'f1_score': f1_score(all_labels, all_preds, average='weighted')
-        }
+
+                outputs = self.forward_model(input_ids, attention_mask)
+                metrics.update_logits(outputs, labels)
+
+        if self.distributed:
+            metrics.all_reduce()
+        self.model.train(was_training)
+        return metrics.compute()
+
+    def subsample_loader(self, loader: DataLoader, num_samples: int, seed: int = 42) -> DataLoader:
+        """Loader over a fixed random subset of the dataset, for cheap mid-epoch evaluation"""
+        dataset = loader.dataset
+        if num_samples >= len(dataset):
+            return loader
+        indices = sorted(random.Random(seed).sample(range(len(dataset)), num_samples))
+        batch_size = loader.batch_size or loader.batch_sampler.batch_size
+        return DataLoader(Subset(dataset, indices), batch_size=batch_size, num_workers=loader.num_workers, collate_fn=loader.collate_fn)
 
 if __name__ == "__main__":
     import sys
     logging.basicConfig(level=logging.INFO)
-    
+
     from src.model.architecture import TransformerClassifier
     from torch.utils.data import TensorDataset
-    
+
     # Sample data
     input_ids = torch.randint(0, 100, (100, 32))
     attention_mask = torch.ones_like(input_ids)
     labels = torch.randint(0, 5, (100,))
-    
+
     dataset = TensorDataset(input_ids, attention_mask, labels)
     loader = DataLoader(dataset, batch_size=16)
-    
+
     model = TransformerClassifier("bert-base-uncased", num_classes=5)
     trainer = ModelTrainer(model)
-    trainer.train(loader, loader, epochs=2)
\ No newline at end of file
+    trainer.train(loader, loader, epochs=2)
@@ -8,6 +8,8 @@ from sklearn.model_selection import train_test_split
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, TrainingArguments, Trainer
 import torch
 from .preprocessing import preprocess_text
+from .preprocessing.tokenized_dataset import DatasetCompiler, TokenizedDataset
+from .model.evaluation import StreamingMetrics
 from .monitoring import log_training_metrics
 
 logger = logging.getLogger(__name__)
@@ -51,6 +53,31 @@ class ModelTrainer:
         
         return train_texts, val_texts, train_labels, val_labels
 
+    def compile_data(self, data_path: str, output_dir: str = None) -> str:
+        """Clean and tokenize the training data once into memory-mapped splits"""
+        output_dir = output_dir or f"data/processed/training_sets/{self.model_name}-{self.model_version}"
+        self.label2id = {label: i for i, label in enumerate(self.categories)}
+        compiler = DatasetCompiler(
+            tokenizer_name='bert-base-uncased',
+            max_length=self.config['model'].get('params', {}).get('max_sequence_length', 512),
+            clean_fn=preprocess_text,
+            truncation=self.config['model'].get('truncation', 'head')
+        )
+        compiler.compile(
+            data_path,
+            output_dir,
+            label2id=self.label2id,
+            validation_split=self.config['training']['validation_split']
+        )
+        return output_dir
+
+    def load_compiled_data(self, output_dir: str):
+        """Open compiled train and validation splits without re-tokenizing"""
+        return (
+            TokenizedDataset(os.path.join(output_dir, "train")),
+            TokenizedDataset(os.path.join(output_dir, "validation"))
+        )
+
     def train(self, train_data: Dict[str, Any], validation_data: Dict[str, Any]):
         """Train the model with the prepared data."""
         try:
@@ -61,17 +88,24 @@ class ModelTrainer:
                 per_device_train_batch_size=self.config['training']['batch_size'],
                 per_device_eval_batch_size=self.config['training']['batch_size'],
                 learning_rate=self.config['training']['learning_rate'],
-                evaluation_strategy="epoch",
+                eval_strategy="epoch",
                 save_strategy="epoch",
                 load_best_model_at_end=True,
+                dataloader_num_workers=self.config['training'].get('dataloader_workers', 0),
+                batch_eval_metrics=True,
             )
 
+            # Compiled datasets hold unpadded sequences and pad per batch
+            data_collator = train_data.collate if isinstance(train_data, TokenizedDataset) else None
+
             # Initialize trainer
             trainer = Trainer(
                 model=self.model,
                 args=training_args,
                 train_dataset=train_data,
                 eval_dataset=validation_data,
+                data_collator=data_collator,
+                compute_metrics=StreamingMetrics(len(self.categories)).compute_metrics,
             )
 
             # Train model
@@ -95,7 +129,19 @@ class ModelTrainer:
     def evaluate(self, test_data: Dict[str, Any]) -> Dict[str, float]:
         """Evaluate the model on test data."""
         try:
-            trainer = Trainer(model=self.model)
+            data_collator = test_data.collate if isinstance(test_data, TokenizedDataset) else None
+            # Metrics stream through a confusion matrix instead of gathering every logit
+            eval_args = TrainingArguments(
+                output_dir=f"models/trained_model/{self.model_name}-{self.model_version}",
+                per_device_eval_batch_size=self.config['training']['batch_size'],
+                batch_eval_metrics=True,
+            )
+            trainer = Trainer(
+                model=self.model,
+                args=eval_args,
+                data_collator=data_collator,
+                compute_metrics=StreamingMetrics(len(self.categories)).compute_metrics,
+            )
             metrics = trainer.evaluate(test_data)
             log_training_metrics(metrics, prefix="test")
             return metrics
@@ -110,13 +156,14 @@ if __name__ == "__main__":
     # Initialize trainer
     trainer = ModelTrainer()
     
-    # Prepare data
-    train_texts, val_texts, train_labels, val_labels = trainer.prepare_data("data/processed/training_data.csv")
+    # Compile data once, then reuse it across runs
+    dataset_dir = trainer.compile_data("data/processed/training_data.csv")
+    train_data, val_data = trainer.load_compiled_data(dataset_dir)
     
     # Train model
-    train_metrics = trainer.train(train_texts, train_labels)
+    train_metrics = trainer.train(train_data, val_data)
     
     # Evaluate model
-    test_metrics = trainer.evaluate(val_texts, val_labels)
+    test_metrics = trainer.evaluate(val_data)
     
     logger.info(f"Training completed. Test metrics: {test_metrics}")
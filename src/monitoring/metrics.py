@@ -0,0 +1,116 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Model registry
+MODEL_LOAD_SECONDS = Gauge(
+    "model_load_seconds",
+    "Time taken to load a model into the registry",
+    ["model"]
+)
+MODEL_MEMORY_BYTES = Gauge(
+    "model_memory_bytes",
+    "Memory held by the parameters and buffers of a loaded model",
+    ["model"]
+)
+
+# Micro-batching
+BATCH_QUEUE_DEPTH = Gauge(
+    "inference_batch_queue_depth",
+    "Number of texts waiting to be batched",
+    ["model"]
+)
+BATCH_SIZE = Histogram(
+    "inference_batch_size",
+    "Number of texts per forward pass",
+    ["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+BATCH_QUEUE_SECONDS = Histogram(
+    "inference_batch_queue_seconds",
+    "Time a text waits in the batching queue before its forward pass starts",
+    ["model"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+# Prediction cache
+CACHE_HITS = Counter(
+    "prediction_cache_hits_total",
+    "Prediction cache hits",
+    ["tier"]
+)
+CACHE_MISSES = Counter(
+    "prediction_cache_misses_total",
+    "Prediction cache misses",
+    ["tier"]
+)
+CACHE_EVICTIONS = Counter(
+    "prediction_cache_evictions_total",
+    "Prediction cache evictions",
+    ["tier", "reason"]
+)
+
+# Rate limiting
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total",
+    "Rate limit decisions by outcome and by where they were made (redis, lease, local)",
+    ["decision", "source"]
+)
+RATE_LIMIT_DEGRADED = Counter(
+    "rate_limit_degraded_total",
+    "Redis calls that failed or timed out and put the limiter into local-only mode"
+)
+
+# Authentication
+AUTH_CACHE_LOOKUPS = Counter(
+    "auth_token_cache_lookups_total",
+    "Verified-token cache lookups by result (hit, miss, revoked)",
+    ["result"]
+)
+AUTH_CACHE_EVICTIONS = Counter(
+    "auth_token_cache_evictions_total",
+    "Verified-token cache evictions",
+    ["reason"]
+)
+AUTH_REVOCATIONS = Counter(
+    "auth_revocations_total",
+    "Token revocations by scope (token, user)",
+    ["scope"]
+)
+
+# Prediction log
+PREDICTION_LOG_QUEUE_DEPTH = Gauge(
+    "prediction_log_queue_depth",
+    "Prediction log rows waiting to be written"
+)
+PREDICTION_LOG_LAG_SECONDS = Histogram(
+    "prediction_log_lag_seconds",
+    "Time from queueing a prediction log row to committing it",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+PREDICTION_LOG_FLUSH_SECONDS = Histogram(
+    "prediction_log_flush_seconds",
+    "Time to write one batch of prediction log rows",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+PREDICTION_LOG_ROWS = Counter(
+    "prediction_log_rows_total",
+    "Prediction log rows by outcome (written, dropped, failed)",
+    ["status"]
+)
+
+# Inference latency breakdown
+INFERENCE_STAGE_SECONDS = Histogram(
+    "inference_stage_seconds",
+    "Time spent in each stage of Predictor.batch_predict",
+    ["stage", "model_version", "batch_size"],
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+INFERENCE_REQUEST_SECONDS = Histogram(
+    "inference_request_seconds",
+    "Time a call to the inference executor spends waiting for a worker (queue) and running on it (compute)",
+    ["model", "phase"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+def batch_size_bucket(batch_size: int) -> str:
+    """Round a batch size up to a power of two to keep label cardinality bounded"""
+    return str(1 << max(0, batch_size - 1).bit_length())
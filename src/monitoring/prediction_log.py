@@ -0,0 +1,277 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from io import StringIO
+from typing import Dict, Any, List, Optional, Tuple
+from src.monitoring.metrics import (
+    PREDICTION_LOG_QUEUE_DEPTH, PREDICTION_LOG_LAG_SECONDS, PREDICTION_LOG_ROWS, PREDICTION_LOG_FLUSH_SECONDS
+)
+
+COLUMNS = ("created_at", "source", "user_id", "model_version", "input_text", "prediction", "confidence", "payload")
+
+POSTGRES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMPTZ NOT NULL,
+    source TEXT,
+    user_id TEXT,
+    model_version TEXT,
+    input_text TEXT,
+    prediction INTEGER,
+    confidence DOUBLE PRECISION,
+    payload JSONB
+)
+"""
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    source TEXT,
+    user_id TEXT,
+    model_version TEXT,
+    input_text TEXT,
+    prediction INTEGER,
+    confidence REAL,
+    payload TEXT
+)
+"""
+
+OVERFLOW_POLICIES = ("drop", "block")
+
+# Queued row and the perf_counter time it was queued at
+QueueItem = Tuple[tuple, float]
+
+def prediction_record(source: str,
+                      text: Any,
+                      prediction: Dict[str, Any],
+                      user_id: Optional[str] = None,
+                      model_version: Optional[str] = None) -> tuple:
+    """Build a prediction_log row from a prediction result"""
+    return (
+        datetime.now(timezone.utc).isoformat(),
+        source,
+        user_id,
+        model_version,
+        text if isinstance(text, str) else json.dumps(text),
+        prediction.get("prediction"),
+        prediction.get("confidence"),
+        json.dumps(prediction)
+    )
+
+def _copy_value(value: Any) -> str:
+    """Escape a value for COPY ... FROM STDIN in text format"""
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+class PredictionLogSink:
+    """Persists prediction records to PostgreSQL (or SQLite) from a bounded in-memory queue.
+
+    Requests only enqueue a row; a background task drains the queue and writes
+    batches of up to ``batch_size`` rows, flushing early once the oldest
+    queued row has waited ``flush_interval_ms``. PostgreSQL batches are
+    loaded with COPY, SQLite batches with a single executemany transaction.
+    All database work runs on one dedicated thread, which owns the
+    connection. When the queue is full, ``drop`` discards the row and
+    ``block`` waits up to ``block_timeout_ms`` for space before dropping it.
+    """
+
+    def __init__(self,
+                 url: str,
+                 table: str = "prediction_log",
+                 max_queue_size: int = 10000,
+                 batch_size: int = 500,
+                 flush_interval_ms: float = 1000,
+                 overflow: str = "drop",
+                 block_timeout_ms: float = 100):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow} (expected one of {OVERFLOW_POLICIES})")
+        self.logger = logging.getLogger(__name__)
+        self.url = url
+        self.table = table
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.overflow = overflow
+        self.block_timeout = block_timeout_ms / 1000
+        self.dialect = "sqlite" if url.startswith("sqlite://") else "postgresql"
+        self._connection = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prediction-log")
+        self.logger.info(f"Initialized PredictionLogSink ({self.dialect}, batch_size={batch_size}, overflow={overflow})")
+
+    async def start(self):
+        """Create the table if needed and start the background writer"""
+        if self._worker is None:
+            try:
+                await asyncio.get_running_loop().run_in_executor(self._writer, self._connect)
+            except Exception as e:
+                # Serving does not wait for the database; each batch retries the connection
+                self.logger.error(f"Error connecting prediction log: {e}")
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Write every queued row, then close the connection"""
+        if self._worker is not None:
+            # Rows logged from here on are dropped rather than queued behind the sentinel
+            worker, self._worker = self._worker, None
+            await self._queue.put(None)
+            await worker
+        await asyncio.get_running_loop().run_in_executor(self._writer, self._close)
+        self._writer.shutdown(wait=True)
+        PREDICTION_LOG_QUEUE_DEPTH.set(0)
+
+    async def log(self, record: tuple) -> bool:
+        """Queue a row for writing; returns False if it was dropped"""
+        if self._worker is None:
+            PREDICTION_LOG_ROWS.labels(status="dropped").inc()
+            return False
+        item = (record, time.perf_counter())
+        try:
+            if self.overflow == "block":
+                await asyncio.wait_for(self._queue.put(item), timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(item)
+        except (asyncio.QueueFull, asyncio.TimeoutError):
+            PREDICTION_LOG_ROWS.labels(status="dropped").inc()
+            self.logger.warning("Prediction log queue full, dropping record")
+            return False
+        PREDICTION_LOG_QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _collect(self) -> Tuple[List[QueueItem], bool]:
+        """Wait for the first row, then gather more until the batch is full or the oldest row is due"""
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = first[1] + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get_nowait() if remaining <= 0 else await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect()
+            PREDICTION_LOG_QUEUE_DEPTH.set(self._queue.qsize())
+            if not batch:
+                continue
+            started = time.perf_counter()
+            try:
+                await loop.run_in_executor(self._writer, self._write, [record for record, _ in batch])
+            except Exception as e:
+                self.logger.error(f"Error writing {len(batch)} prediction log rows: {e}")
+                PREDICTION_LOG_ROWS.labels(status="failed").inc(len(batch))
+                continue
+            finished = time.perf_counter()
+            PREDICTION_LOG_FLUSH_SECONDS.observe(finished - started)
+            PREDICTION_LOG_ROWS.labels(status="written").inc(len(batch))
+            for _, enqueued_at in batch:
+                PREDICTION_LOG_LAG_SECONDS.observe(finished - enqueued_at)
+
+    def _connect(self):
+        """Open the connection and create the table; runs on the writer thread"""
+        if self._connection is not None:
+            return
+        if self.dialect == "sqlite":
+            # sqlite:///relative.db, sqlite:////absolute.db, or sqlite:// for in-memory
+            path = self.url[len("sqlite:///"):] if self.url.startswith("sqlite:///") else ""
+            self._connection = sqlite3.connect(path or ":memory:")
+            schema = SQLITE_SCHEMA
+        else:
+            import psycopg2
+
+            self._connection = psycopg2.connect(self.url)
+            schema = POSTGRES_SCHEMA
+        cursor = self._connection.cursor()
+        cursor.execute(schema.format(table=self.table))
+        self._connection.commit()
+        cursor.close()
+
+    def _write(self, rows: List[tuple]):
+        """Write one batch in a single transaction; runs on the writer thread"""
+        self._connect()
+        cursor = self._connection.cursor()
+        try:
+            if self.dialect == "sqlite":
+                placeholders = ", ".join("?" for _ in COLUMNS)
+                cursor.executemany(f"INSERT INTO {self.table} ({', '.join(COLUMNS)}) VALUES ({placeholders})", rows)
+            else:
+                buffer = StringIO()
+                for row in rows:
+                    buffer.write("\t".join(_copy_value(value) for value in row) + "\n")
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {self.table} ({', '.join(COLUMNS)}) FROM STDIN", buffer)
+            self._connection.commit()
+            cursor.close()
+        except Exception:
+            # Drop the connection so the next batch starts from a clean one; closing it also closes the cursor
+            self._close()
+            raise
+
+    def _close(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception as e:
+                self.logger.error(f"Error closing prediction log connection: {e}")
+            self._connection = None
+
+def database_url(config: Dict[str, Any]) -> str:
+    """Connection URL from DATABASE_URL or the database config section"""
+    if os.environ.get("DATABASE_URL"):
+        return os.environ["DATABASE_URL"]
+    return (f"postgresql://{config.get('user', 'postgres')}:{config.get('password', '')}"
+            f"@{config.get('host', 'localhost')}:{config.get('port', 5432)}/{config.get('name', 'postgres')}")
+
+def build_prediction_log(config: Optional[Dict[str, Any]]) -> Optional[PredictionLogSink]:
+    """Build a prediction log sink from the database config section"""
+    config = config or {}
+    log_config = config.get('prediction_log')
+    if not log_config or not log_config.get('enabled', False):
+        return None
+    return PredictionLogSink(
+        log_config.get('url') or database_url(config),
+        table=log_config.get('table', "prediction_log"),
+        max_queue_size=log_config.get('max_queue_size', 10000),
+        batch_size=log_config.get('batch_size', 500),
+        flush_interval_ms=log_config.get('flush_interval_ms', 1000),
+        overflow=log_config.get('overflow', "drop"),
+        block_timeout_ms=log_config.get('block_timeout_ms', 100)
+    )
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    async def main():
+        sink = PredictionLogSink("sqlite:///prediction_log.db", batch_size=100, flush_interval_ms=50)
+        await sink.start()
+        for i in range(250):
+            prediction = {"prediction": i % 5, "confidence": 0.9, "probabilities": [0.1, 0.9]}
+            await sink.log(prediction_record("demo", f"Sample text number {i}", prediction, user_id="testuser"))
+        await sink.stop()
+        connection = sqlite3.connect("prediction_log.db")
+        print(f"Rows written: {connection.execute('SELECT COUNT(*) FROM prediction_log').fetchone()[0]}")
+
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+import torch
+from torch.profiler import ProfilerActivity, profile
+
+class TraceSampler:
+    """Records torch.profiler traces of the next few predictor calls once armed.
+
+    Nothing is profiled until ``arm`` is called (normally through the
+    /debug/profile endpoint); each armed capture then profiles one live
+    batch_predict call and writes a Chrome trace to ``output_dir``, which
+    can be opened in Perfetto or chrome://tracing. At most one capture runs
+    at a time, and concurrent calls run unprofiled.
+    """
+
+    def __init__(self, output_dir: str = "profiles", max_captures: int = 10, record_shapes: bool = True):
+        self.logger = logging.getLogger(__name__)
+        self.output_dir = output_dir
+        self.max_captures = max_captures
+        self.record_shapes = record_shapes
+        self.traces: List[str] = []
+        self._remaining = 0
+        self._lock = threading.Lock()
+        self._active = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional["TraceSampler"]:
+        """Build a sampler from the serving.profiling config section, or None when disabled"""
+        if not config or not config.get('enabled', False):
+            return None
+        return cls(
+            output_dir=config.get('output_dir', "profiles"),
+            max_captures=config.get('max_captures', 10),
+            record_shapes=config.get('record_shapes', True)
+        )
+
+    def arm(self, count: int = 1) -> int:
+        """Profile the next count calls; returns how many captures are now pending"""
+        with self._lock:
+            self._remaining = min(self.max_captures, self._remaining + max(0, count))
+            return self._remaining
+
+    @property
+    def pending(self) -> int:
+        return self._remaining
+
+    @property
+    def armed(self) -> bool:
+        return self._remaining > 0
+
+    def _take(self) -> bool:
+        with self._lock:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            return True
+
+    @contextmanager
+    def capture(self, batch_size: int):
+        """Profile the enclosed call if a capture is pending and no other is running"""
+        if not self._active.acquire(blocking=False):
+            yield
+            return
+        try:
+            if not self._take():
+                yield
+                return
+            activities = [ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(ProfilerActivity.CUDA)
+            os.makedirs(self.output_dir, exist_ok=True)
+            path = os.path.join(
+                self.output_dir,
+                f"trace-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{len(self.traces)}-batch{batch_size}.json"
+            )
+            with profile(activities=activities, record_shapes=self.record_shapes) as profiler:
+                yield
+            profiler.export_chrome_trace(path)
+            self.traces.append(path)
+            self.logger.info(f"Wrote profiler trace to {path}")
+        finally:
+            self._active.release()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    sampler = TraceSampler(output_dir="profiles")
+    sampler.arm(1)
+    model = torch.nn.Linear(64, 8)
+    for _ in range(2):
+        with sampler.capture(batch_size=32):
+            model(torch.randn(32, 64))
+    print(f"Traces: {sampler.traces}")
@@ -1,12 +1,26 @@
+import hashlib
 import logging
 import pandas as pd
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Callable, Tuple, Iterator
 import json
-from jsonschema import validate, ValidationError
+from jsonschema import ValidationError
+from jsonschema.validators import validator_for
+
+JSON_READ_SIZE = 1 << 20
+# A value or error this close to the end of the buffered text may just be cut off by the block boundary
+JSON_TAIL_MARGIN = 64
+
+class JSONStreamError(ValueError):
+    """Malformed JSON array, with the character offset in the file where parsing stopped"""
+
+    def __init__(self, message: str, offset: Optional[int] = None):
+        super().__init__(message)
+        self.offset = offset
 
 class DataValidator:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self._json_validators: Dict[str, Any] = {}
         self.logger.info("Data validator initialized")
 
     def validate_csv(self, file_path: str, schema: Dict[str, Any]) -> Optional[pd.DataFrame]:
@@ -19,17 +33,282 @@ class DataValidator:
             self.logger.error(f"CSV validation error: {e}")
             return None
 
+    def validate_csv_stream(self,
+                            file_path: str,
+                            schema: Dict[str, Any],
+                            chunksize: int = 100000,
+                            sink: Optional[Callable[[pd.DataFrame], None]] = None,
+                            max_errors: int = 1000) -> Dict[str, Any]:
+        """Validate a CSV file chunk by chunk, reporting row-level errors and passing valid rows to sink"""
+        report = {
+            'valid': False,
+            'rows': 0,
+            'valid_rows': 0,
+            'invalid_rows': 0,
+            'error_count': 0,
+            'errors': []
+        }
+        try:
+            header = pd.read_csv(file_path, nrows=0).columns
+            missing = [col for col in schema.get('required_columns', []) if col not in header]
+            if missing:
+                report['errors'] = [{'row': None, 'column': col, 'error': 'Missing required column'} for col in missing]
+                report['error_count'] = len(missing)
+                return report
+
+            # Read only schema columns, as strings, so chunks never disagree on inferred dtypes
+            schema_columns = set(schema.get('required_columns', [])) | set(schema.get('column_types', {})) | set(schema.get('non_null_columns', []))
+            usecols = [col for col in header if col in schema_columns] or None
+            reader = pd.read_csv(file_path, chunksize=chunksize, usecols=usecols, dtype=str)
+
+            for chunk in reader:
+                valid_chunk, errors = self._validate_chunk(chunk, schema)
+                report['rows'] += len(chunk)
+                report['valid_rows'] += len(valid_chunk)
+                report['error_count'] += len(errors)
+                remaining = max_errors - len(report['errors'])
+                if remaining > 0:
+                    report['errors'].extend(errors[:remaining])
+                if sink is not None and len(valid_chunk):
+                    sink(valid_chunk)
+
+            report['invalid_rows'] = report['rows'] - report['valid_rows']
+            report['valid'] = report['error_count'] == 0
+            return report
+        except Exception as e:
+            self.logger.error(f"CSV stream validation error: {e}")
+            report['errors'].append({'row': None, 'column': None, 'error': str(e)})
+            report['error_count'] += 1
+            return report
+
+    def _validate_chunk(self, chunk: pd.DataFrame, schema: Dict[str, Any]) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+        """Validate one chunk, returning its valid rows with schema dtypes applied and the row errors"""
+        invalid = pd.Series(False, index=chunk.index)
+        errors = []
+
+        for col, dtype in schema.get('column_types', {}).items():
+            if col not in chunk.columns:
+                continue
+            converted, bad = self._coerce_column(chunk[col], dtype)
+            chunk[col] = converted
+            invalid |= bad
+            errors.extend({'row': int(row), 'column': col, 'error': f'Expected {dtype}'} for row in chunk.index[bad])
+
+        for col in schema.get('non_null_columns', []):
+            if col not in chunk.columns:
+                continue
+            nulls = chunk[col].isnull()
+            invalid |= nulls
+            errors.extend({'row': int(row), 'column': col, 'error': 'Null value'} for row in chunk.index[nulls])
+
+        errors.sort(key=lambda error: error['row'])
+        valid_chunk = chunk[~invalid]
+        non_null = set(schema.get('non_null_columns', []))
+        for col, dtype in schema.get('column_types', {}).items():
+            if col not in valid_chunk.columns:
+                continue
+            # Decided by the schema alone, so every chunk reaches the sink with the same dtypes
+            dtype = pd.api.types.pandas_dtype(dtype)
+            if pd.api.types.is_integer_dtype(dtype):
+                valid_chunk = valid_chunk.astype({col: dtype if col in non_null else 'Int64'})
+            elif pd.api.types.is_bool_dtype(dtype):
+                valid_chunk = valid_chunk.astype({col: dtype if col in non_null else 'boolean'})
+            elif pd.api.types.is_float_dtype(dtype):
+                valid_chunk = valid_chunk.astype({col: dtype})
+        return valid_chunk, errors
+
+    @staticmethod
+    def _coerce_column(values: pd.Series, dtype: Any) -> Tuple[pd.Series, pd.Series]:
+        """Convert string values to dtype, returning the converted column and a mask of unconvertible rows"""
+        dtype = pd.api.types.pandas_dtype(dtype)
+        present = values.notna()
+        if pd.api.types.is_bool_dtype(dtype):
+            converted = values.str.strip().str.lower().map({'true': True, 'false': False, '1': True, '0': False})
+        elif pd.api.types.is_numeric_dtype(dtype):
+            converted = pd.to_numeric(values, errors='coerce')
+            if pd.api.types.is_integer_dtype(dtype):
+                converted = converted.where(converted.isna() | (converted == converted.round()), float('nan'))
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            converted = pd.to_datetime(values, errors='coerce')
+        else:
+            return values, pd.Series(False, index=values.index)
+        return converted, present & converted.isna()
+
     def validate_json(self, file_path: str, schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Validate JSON file against schema"""
         try:
             with open(file_path, 'r') as f:
                 data = json.load(f)
-            validate(instance=data, schema=schema)
+            self._get_json_validator(schema).validate(data)
             return data
         except (ValidationError, json.JSONDecodeError) as e:
             self.logger.error(f"JSON validation error: {e}")
             return None
 
+    def validate_json_stream(self,
+                             file_path: str,
+                             schema: Dict[str, Any],
+                             format: str = "auto",
+                             sink: Optional[Callable[[Dict[str, Any]], None]] = None,
+                             max_errors: int = 1000) -> Dict[str, Any]:
+        """Validate each record of a JSON Lines file or top-level JSON array without loading the whole file"""
+        report = {
+            'valid': False,
+            'records': 0,
+            'valid_records': 0,
+            'invalid_records': 0,
+            'error_count': 0,
+            'errors': []
+        }
+        try:
+            validator = self._get_json_validator(schema)
+            if format == "auto":
+                format = "array" if self._first_char(file_path) == "[" else "jsonl"
+            if format == "array":
+                records = ((None, record) for record in self._iter_json_array(file_path))
+            else:
+                records = self._iter_json_lines(file_path)
+
+            for index, (line, record) in enumerate(records):
+                report['records'] += 1
+                if isinstance(record, json.JSONDecodeError):
+                    # A malformed line is one invalid record; the lines after it are still validated
+                    report['error_count'] += 1
+                    if len(report['errors']) < max_errors:
+                        report['errors'].append({'record': index, 'line': line, 'path': [], 'error': f"Invalid JSON: {record.msg}"})
+                    continue
+                errors = list(validator.iter_errors(record))
+                if not errors:
+                    report['valid_records'] += 1
+                    if sink is not None:
+                        sink(record)
+                    continue
+                report['error_count'] += len(errors)
+                for error in errors[:max(0, max_errors - len(report['errors']))]:
+                    report['errors'].append({
+                        'record': index,
+                        'line': line,
+                        'path': list(error.absolute_path),
+                        'error': error.message
+                    })
+
+            report['invalid_records'] = report['records'] - report['valid_records']
+            report['valid'] = report['error_count'] == 0
+            return report
+        except (json.JSONDecodeError, ValueError) as e:
+            self.logger.error(f"JSON stream validation error: {e}")
+            report['errors'].append({
+                'record': report['records'],
+                'line': getattr(e, 'lineno', None),
+                'offset': getattr(e, 'offset', getattr(e, 'pos', None)),
+                'path': [],
+                'error': str(e)
+            })
+            report['error_count'] += 1
+            report['invalid_records'] = report['records'] - report['valid_records']
+            report['valid'] = False
+            return report
+
+    def _get_json_validator(self, schema: Dict[str, Any]):
+        """Return a compiled validator, reusing it for identical schemas"""
+        key = hashlib.sha256(json.dumps(schema, sort_keys=True).encode('utf-8')).hexdigest()
+        validator = self._json_validators.get(key)
+        if validator is None:
+            cls = validator_for(schema)
+            cls.check_schema(schema)
+            validator = self._json_validators[key] = cls(schema)
+        return validator
+
+    @staticmethod
+    def _first_char(file_path: str) -> str:
+        with open(file_path, 'r') as f:
+            while True:
+                char = f.read(1)
+                if not char or not char.isspace():
+                    return char
+
+    @staticmethod
+    def _iter_json_lines(file_path: str) -> Iterator[Tuple[int, Any]]:
+        """Yield (line number, record) pairs; a malformed line yields its JSONDecodeError as the record"""
+        with open(file_path, 'r') as f:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield line_number, e
+
+    @staticmethod
+    def _iter_json_array(file_path: str) -> Iterator[Any]:
+        """Yield the items of a top-level JSON array, reading the file in blocks"""
+        decoder = json.JSONDecoder()
+        with open(file_path, 'r') as f:
+            raw = f.read(JSON_READ_SIZE)
+            buffer = raw.lstrip()
+            # Character offset of buffer[0] in the file, for error positions
+            offset = len(raw) - len(buffer)
+            if not buffer.startswith('['):
+                raise JSONStreamError("Expected a top-level JSON array", offset)
+            pos = 1
+            eof = False
+            expect_item = True
+            after_comma = False
+            while True:
+                # Skip whitespace and separators, refilling the buffer when it runs out
+                while True:
+                    while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                        pos += 1
+                    if pos < len(buffer) or eof:
+                        break
+                    offset += len(buffer)
+                    buffer, pos = f.read(JSON_READ_SIZE), 0
+                    eof = not buffer
+                if pos >= len(buffer):
+                    raise JSONStreamError("Unterminated JSON array", offset + pos)
+                if buffer[pos] == ']':
+                    if after_comma:
+                        raise JSONStreamError(f"Trailing ',' in JSON array at offset {offset + pos}", offset + pos)
+                    # Only whitespace may follow the closing bracket
+                    rest, rest_offset = buffer[pos + 1:], offset + pos + 1
+                    while rest:
+                        stripped = rest.lstrip()
+                        if stripped:
+                            position = rest_offset + len(rest) - len(stripped)
+                            raise JSONStreamError(f"Unexpected data after JSON array at offset {position}", position)
+                        rest_offset += len(rest)
+                        rest = f.read(JSON_READ_SIZE)
+                    return
+                if not expect_item:
+                    if buffer[pos] != ',':
+                        raise JSONStreamError(f"Expected ',' in JSON array at offset {offset + pos}, got {buffer[pos]!r}", offset + pos)
+                    pos += 1
+                    expect_item = after_comma = True
+                    continue
+
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                    # A value ending near the buffer edge (e.g. a number cut at "1.") may continue in the next block
+                    complete = eof or end + JSON_TAIL_MARGIN < len(buffer)
+                except json.JSONDecodeError as e:
+                    # Only an error at the tail of the buffered text (or inside a string still
+                    # running at the tail) can be a cut-off value; anything else is malformed
+                    truncated = e.pos + JSON_TAIL_MARGIN >= len(buffer) or e.msg.startswith("Unterminated string")
+                    if eof or not truncated:
+                        raise JSONStreamError(f"Invalid JSON at offset {offset + e.pos}: {e.msg}", offset + e.pos) from e
+                    complete = False
+                if not complete:
+                    more = f.read(JSON_READ_SIZE)
+                    eof = not more
+                    offset += pos
+                    buffer, pos = buffer[pos:] + more, 0
+                    continue
+                yield item
+                pos = end
+                expect_item = after_comma = False
+                if pos > JSON_READ_SIZE:
+                    offset += pos
+                    buffer, pos = buffer[pos:], 0
+
     def _validate_dataframe(self, df: pd.DataFrame, schema: Dict[str, Any]) -> bool:
         """Validate DataFrame against schema"""
         try:
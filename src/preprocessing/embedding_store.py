@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Any, List, Tuple, Callable, Optional
+import numpy as np
+
+class EmbeddingStore:
+    """Content-addressed on-disk store of sentence embeddings.
+
+    Embeddings are keyed by a hash of the encoder id and the text, and kept in
+    append-only NumPy shards (float32 or float16) that are memory-mapped on open. Each shard has a
+    companion array of keys; ``index.json`` records the encoder, dimension and
+    shard list. Every ``put_many`` call writes one shard, so once there are
+    more than ``max_shards`` they are merged into one. The store assumes a
+    single writer.
+    """
+
+    def __init__(self,
+                 root: str,
+                 encoder_name: str,
+                 dim: int,
+                 encoder_version: str = "1",
+                 dtype: str = "float32",
+                 max_shards: int = 64):
+        self.logger = logging.getLogger(__name__)
+        self.root = root
+        self.encoder_id = f"{encoder_name}@{encoder_version}"
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.max_shards = max_shards
+        self._shards: List[np.ndarray] = []
+        self._names: List[str] = []
+        self._next_shard = 0
+        self._index: Dict[bytes, Tuple[int, int]] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'encoded': 0, 'encode_seconds': 0.0}
+        os.makedirs(root, exist_ok=True)
+        self._open()
+        self.logger.info(f"Opened embedding store at {root} with {len(self)} embeddings for {self.encoder_id}")
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.root, "index.json")
+
+    def _open(self):
+        if not os.path.exists(self._index_path):
+            self._write_index([])
+            return
+        with open(self._index_path, 'r') as f:
+            meta = json.load(f)
+        stored_dtype = meta.get('dtype', 'float32')
+        if meta['encoder_id'] != self.encoder_id or meta['dim'] != self.dim or stored_dtype != self.dtype.name:
+            raise ValueError(f"Embedding store at {self.root} was built for {meta['encoder_id']} (dim {meta['dim']}, {stored_dtype})")
+        for shard_id, name in enumerate(meta['shards']):
+            self._shards.append(np.load(os.path.join(self.root, f"{name}.npy"), mmap_mode='r'))
+            self._names.append(name)
+            keys = np.load(os.path.join(self.root, f"{name}.keys.npy"))
+            for row, key in enumerate(self._raw_keys(keys)):
+                self._index[key] = (shard_id, row)
+        self._next_shard = max((int(name.rsplit('-', 1)[1]) + 1 for name in self._names), default=0)
+
+    def _write_index(self, shards: List[str]):
+        # Write then rename so readers never see a partial index
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'encoder_id': self.encoder_id, 'dim': self.dim, 'dtype': self.dtype.name, 'shards': shards}, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _write_shard(self, embeddings: np.ndarray, keys: np.ndarray) -> str:
+        """Save a new shard under a name no earlier shard has used"""
+        name = f"shard-{self._next_shard:05d}"
+        self._next_shard += 1
+        np.save(os.path.join(self.root, f"{name}.npy"), np.asarray(embeddings, dtype=self.dtype))
+        np.save(os.path.join(self.root, f"{name}.keys.npy"), keys)
+        return name
+
+    @staticmethod
+    def _raw_keys(keys: np.ndarray) -> List[bytes]:
+        """Full 32-byte digests from an S32 array, whose scalars would drop trailing NUL bytes"""
+        return [row.tobytes() for row in keys.view(np.uint8).reshape(-1, 32)]
+
+    def key(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.encoder_id}\0{text}".encode('utf-8')).digest()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Return a read-only view of the stored embedding, without copying"""
+        location = self._index.get(self.key(text))
+        if location is None:
+            return None
+        shard_id, row = location
+        return self._shards[shard_id][row]
+
+    def get_many(self, texts: List[str]) -> Tuple[np.ndarray, List[int]]:
+        """Gather stored embeddings into a new matrix (one row copy per text), returning it and the indices of texts not in the store"""
+        embeddings = np.zeros((len(texts), self.dim), dtype=self.dtype)
+        missing = []
+        for i, text in enumerate(texts):
+            location = self._index.get(self.key(text))
+            if location is None:
+                missing.append(i)
+            else:
+                shard_id, row = location
+                embeddings[i] = self._shards[shard_id][row]
+        return embeddings, missing
+
+    def put_many(self, texts: List[str], embeddings: np.ndarray):
+        """Append embeddings for texts not already stored as a new shard, compacting past max_shards"""
+        keys, rows, seen = [], [], set()
+        for i, text in enumerate(texts):
+            key = self.key(text)
+            if key not in self._index and key not in seen:
+                seen.add(key)
+                keys.append(key)
+                rows.append(i)
+        if not keys:
+            return
+
+        shard_id = len(self._shards)
+        name = self._write_shard(embeddings[rows], np.array(keys, dtype='S32'))
+        self._shards.append(np.load(os.path.join(self.root, f"{name}.npy"), mmap_mode='r'))
+        self._names.append(name)
+        for row, key in enumerate(keys):
+            self._index[key] = (shard_id, row)
+        self._write_index(self._names)
+        if len(self._shards) > self.max_shards:
+            self.compact()
+
+    def compact(self):
+        """Merge every shard into one, so lookups and opening stop scaling with the number of writes"""
+        if len(self._shards) <= 1:
+            return
+        keys = np.empty(len(self._index), dtype='S32')
+        embeddings = np.empty((len(self._index), self.dim), dtype=self.dtype)
+        for row, (key, (shard_id, shard_row)) in enumerate(self._index.items()):
+            keys[row] = key
+            embeddings[row] = self._shards[shard_id][shard_row]
+        name = self._write_shard(embeddings, keys)
+        old_names = self._names
+        # The index switches to the merged shard atomically; only then are the old files removed
+        self._write_index([name])
+        self._shards = [np.load(os.path.join(self.root, f"{name}.npy"), mmap_mode='r')]
+        self._names = [name]
+        self._index = {key: (0, row) for row, key in enumerate(self._raw_keys(keys))}
+        for old_name in old_names:
+            for suffix in (".npy", ".keys.npy"):
+                os.remove(os.path.join(self.root, old_name + suffix))
+        self.logger.info(f"Compacted {len(old_names)} embedding shards into {name}")
+
+    def encode(self, texts: List[str], encoder: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Return embeddings for texts, encoding and storing only those not seen before"""
+        embeddings, missing = self.get_many(texts)
+        hits = len(texts) - len(missing)
+        if missing:
+            # Encode each distinct missing text once
+            positions: Dict[str, List[int]] = {}
+            for i in missing:
+                positions.setdefault(texts[i], []).append(i)
+            new_texts = list(positions)
+
+            start = time.perf_counter()
+            new_embeddings = np.asarray(encoder(new_texts), dtype=self.dtype)
+            elapsed = time.perf_counter() - start
+            for text, embedding in zip(new_texts, new_embeddings):
+                embeddings[positions[text]] = embedding
+            self.put_many(new_texts, new_embeddings)
+            self.stats['encoded'] += len(new_texts)
+            self.stats['encode_seconds'] += elapsed
+        self.stats['hits'] += hits
+        self.stats['misses'] += len(missing)
+        return embeddings
+
+    def report(self) -> Dict[str, Any]:
+        """Hit rate and encoding time saved since the store was opened"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        # Every lookup not sent to the encoder is priced at the observed per-text encoding cost
+        seconds_per_text = self.stats['encode_seconds'] / self.stats['encoded'] if self.stats['encoded'] else 0.0
+        return {
+            **self.stats,
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+            'seconds_saved': (lookups - self.stats['encoded']) * seconds_per_text,
+            'stored': len(self)
+        }
+
+if __name__ == "__main__":
+    import tempfile
+    logging.basicConfig(level=logging.INFO)
+
+    with tempfile.TemporaryDirectory() as root:
+        store = EmbeddingStore(root, "random-encoder", dim=4)
+        encoder = lambda texts: np.random.rand(len(texts), 4)
+        store.encode(["first text", "second text"], encoder)
+        store.encode(["first text", "third text"], encoder)
+        print(f"Store report: {store.report()}")
@@ -1,47 +1,197 @@
+import hashlib
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterable, Iterator, Optional, Union
+import joblib
 import numpy as np
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import StandardScaler
+import torch
 from sentence_transformers import SentenceTransformer
+from sentence_transformers.models import Normalize
+from src.preprocessing.embedding_store import EmbeddingStore
+
+Features = Union[np.ndarray, sparse.csr_matrix]
+
+ENCODER_NAME = 'all-MiniLM-L6-v2'
 
 class FeatureGenerator:
-    def __init__(self):
+    def __init__(self,
+                 embedding_store_path: Optional[str] = None,
+                 device: Optional[str] = None,
+                 encode_batch_size: int = 64,
+                 encode_workers: int = 1,
+                 embedding_dtype: str = "float32"):
         self.logger = logging.getLogger(__name__)
         self.tfidf_vectorizer = TfidfVectorizer(max_features=5000)
-        self.sentence_encoder = SentenceTransformer('all-MiniLM-L6-v2')
-        self.scaler = StandardScaler()
-        self.logger.info("Feature generator initialized")
+        self.sentence_encoder = SentenceTransformer(ENCODER_NAME, device=device)
+        self.encode_batch_size = encode_batch_size
+        self.encode_workers = encode_workers
+        self.embedding_dtype = np.dtype(embedding_dtype)
+        self._encode_pool = None
+        self.embedding_store = None
+        if embedding_store_path:
+            self.embedding_store = EmbeddingStore(
+                embedding_store_path,
+                ENCODER_NAME,
+                dim=self.sentence_encoder.get_sentence_embedding_dimension(),
+                encoder_version=self._encoder_version(),
+                dtype=embedding_dtype
+            )
+        # TF-IDF columns are sparse, so they are scaled without centering
+        self.tfidf_scaler = StandardScaler(with_mean=False)
+        self.embedding_scaler = StandardScaler()
+        self.numeric_scalers: Dict[str, StandardScaler] = {}
+        self.fitted = False
+        self.logger.info(f"Feature generator initialized on device: {self.sentence_encoder.device}")
 
-    def generate_text_features(self, texts: List[str]) -> Dict[str, Any]:
-        """Generate text features using TF-IDF and sentence embeddings"""
+    def fit(self, texts: List[str]) -> "FeatureGenerator":
+        """Fit the TF-IDF vocabulary and feature scalers on a training corpus"""
+        self.fit_transform(texts)
+        return self
+
+    def fit_transform(self, texts: List[str], sparse_output: bool = True) -> Features:
+        """Fit on a training corpus and return its features"""
         try:
-            # TF-IDF features
-            tfidf_features = self.tfidf_vectorizer.fit_transform(texts).toarray()
-            
-            # Sentence embeddings
-            embeddings = self.sentence_encoder.encode(texts)
-            
-            # Combine features
-            features = np.hstack([tfidf_features, embeddings])
-            
-            # Scale features
-            scaled_features = self.scaler.fit_transform(features)
-            
+            tfidf_features = self.tfidf_scaler.fit_transform(self.tfidf_vectorizer.fit_transform(texts))
+            embeddings = self.embedding_scaler.fit_transform(self.encode(texts))
+            self.fitted = True
+            return self._combine(tfidf_features, embeddings, sparse_output)
+        except Exception as e:
+            self.logger.error(f"Error fitting feature generator: {e}")
+            raise
+
+    def transform(self, texts: List[str], sparse_output: bool = True) -> Features:
+        """Generate features with the fitted state, without refitting"""
+        if not self.fitted:
+            raise RuntimeError("FeatureGenerator must be fitted before transform")
+        try:
+            tfidf_features = self.tfidf_scaler.transform(self.tfidf_vectorizer.transform(texts))
+            embeddings = self.embedding_scaler.transform(self.encode(texts))
+            return self._combine(tfidf_features, embeddings, sparse_output)
+        except Exception as e:
+            self.logger.error(f"Error transforming texts: {e}")
+            raise
+
+    def transform_chunked(self, texts: Iterable[str], chunk_size: int = 10000, sparse_output: bool = True) -> Iterator[Features]:
+        """Transform a corpus of any size, yielding one feature matrix per chunk"""
+        chunk = []
+        for text in texts:
+            chunk.append(text)
+            if len(chunk) == chunk_size:
+                yield self.transform(chunk, sparse_output)
+                chunk = []
+        if chunk:
+            yield self.transform(chunk, sparse_output)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Sentence embeddings, reusing the embedding store when one is configured"""
+        if self.embedding_store is None:
+            return self._encode_texts(texts)
+        embeddings = self.embedding_store.encode(texts, self._encode_texts)
+        report = self.embedding_store.report()
+        self.logger.info(f"Embedding store hit rate {report['hit_rate']:.1%}, encoding time saved {report['seconds_saved']:.1f}s")
+        return embeddings
+
+    def _encoder_version(self) -> str:
+        """Identify the embeddings the encoder produces, so a swapped or retrained encoder never reuses stored ones"""
+        digest = hashlib.sha256()
+        for name, tensor in self.sentence_encoder.state_dict().items():
+            digest.update(name.encode('utf-8'))
+            digest.update(tensor.detach().cpu().contiguous().reshape(-1).view(torch.uint8).numpy().tobytes())
+        normalized = any(isinstance(module, Normalize) for module in self.sentence_encoder)
+        return (f"{digest.hexdigest()[:16]}:len{self.sentence_encoder.max_seq_length}"
+                f":{'normalized' if normalized else 'raw'}:{self.embedding_dtype.name}")
+
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        """Encode texts sorted by length so each batch holds similar lengths, then restore order"""
+        if not texts:
+            return np.zeros((0, self.sentence_encoder.get_sentence_embedding_dimension()), dtype=self.embedding_dtype)
+        order = np.argsort([len(text) for text in texts], kind='stable')
+        sorted_texts = [texts[i] for i in order]
+
+        if self.encode_workers > 1:
+            if self._encode_pool is None:
+                self._encode_pool = self.sentence_encoder.start_multi_process_pool(['cpu'] * self.encode_workers)
+            encoded = self.sentence_encoder.encode_multi_process(sorted_texts, self._encode_pool, batch_size=self.encode_batch_size)
+        else:
+            encoded = self.sentence_encoder.encode(sorted_texts, batch_size=self.encode_batch_size, convert_to_numpy=True)
+
+        embeddings = np.empty(encoded.shape, dtype=self.embedding_dtype)
+        embeddings[order] = encoded
+        return embeddings
+
+    def close(self):
+        """Stop the multi-process encoding pool, if one was started"""
+        if self._encode_pool is not None:
+            self.sentence_encoder.stop_multi_process_pool(self._encode_pool)
+            self._encode_pool = None
+
+    @staticmethod
+    def _combine(tfidf_features: sparse.spmatrix, embeddings: np.ndarray, sparse_output: bool) -> Features:
+        if sparse_output:
+            return sparse.hstack([tfidf_features, sparse.csr_matrix(embeddings)], format='csr')
+        return np.hstack([tfidf_features.toarray(), embeddings])
+
+    @property
+    def feature_names(self) -> List[str]:
+        embedding_dim = self.sentence_encoder.get_sentence_embedding_dimension()
+        return self.tfidf_vectorizer.get_feature_names_out().tolist() + ['embedding_' + str(i) for i in range(embedding_dim)]
+
+    def save(self, path: str):
+        """Persist the fitted vectorizer and scalers"""
+        try:
+            joblib.dump({
+                'tfidf_vectorizer': self.tfidf_vectorizer,
+                'tfidf_scaler': self.tfidf_scaler,
+                'embedding_scaler': self.embedding_scaler,
+                'numeric_scalers': self.numeric_scalers,
+                'fitted': self.fitted
+            }, path)
+            self.logger.info(f"Feature generator state saved to {path}")
+        except Exception as e:
+            self.logger.error(f"Error saving feature generator: {e}")
+            raise
+
+    def load(self, path: str) -> "FeatureGenerator":
+        """Restore fitted state saved with save()"""
+        try:
+            state = joblib.load(path)
+            self.tfidf_vectorizer = state['tfidf_vectorizer']
+            self.tfidf_scaler = state['tfidf_scaler']
+            self.embedding_scaler = state['embedding_scaler']
+            self.numeric_scalers = state.get('numeric_scalers', {})
+            self.fitted = state['fitted']
+            self.logger.info(f"Feature generator state loaded from {path}")
+            return self
+        except Exception as e:
+            self.logger.error(f"Error loading feature generator: {e}")
+            raise
+
+    def generate_text_features(self, texts: List[str], sparse_output: bool = False) -> Dict[str, Any]:
+        """Generate text features using TF-IDF and sentence embeddings, fitting on first use; dense unless sparse_output is set"""
+        try:
+            features = self.transform(texts, sparse_output) if self.fitted else self.fit_transform(texts, sparse_output)
             return {
-                'features': scaled_features,
-                'feature_names': self.tfidf_vectorizer.get_feature_names_out().tolist() + ['embedding_' + str(i) for i in range(embeddings.shape[1])]
+                'features': features,
+                'feature_names': self.feature_names
             }
         except Exception as e:
             self.logger.error(f"Error generating text features: {e}")
             return {}
 
-    def generate_numeric_features(self, numeric_data: Dict[str, List[float]]) -> Dict[str, Any]:
-        """Generate scaled numeric features"""
+    def generate_numeric_features(self, numeric_data: Dict[str, List[float]], refit: bool = False) -> Dict[str, Any]:
+        """Generate scaled numeric features, each with its own scaler fitted on first use"""
         try:
             scaled_features = {}
             for feature_name, values in numeric_data.items():
-                scaled_values = self.scaler.fit_transform(np.array(values).reshape(-1, 1))
+                values = np.array(values, dtype=np.float64).reshape(-1, 1)
+                scaler = self.numeric_scalers.get(feature_name)
+                if scaler is None or refit:
+                    scaler = self.numeric_scalers[feature_name] = StandardScaler()
+                    scaled_values = scaler.fit_transform(values)
+                else:
+                    scaled_values = scaler.transform(values)
                 scaled_features[feature_name] = scaled_values.flatten()
             return scaled_features
         except Exception as e:
@@ -51,8 +201,8 @@ class FeatureGenerator:
 if __name__ == "__main__":
     import sys
     logging.basicConfig(level=logging.INFO)
-    
-    generator = FeatureGenerator()
+
+    generator = FeatureGenerator(embedding_store_path="data/features/feature_store")
     sample_texts = ["This is a sample text", "Another example text"]
     features = generator.generate_text_features(sample_texts)
-    print(f"Generated features: {features}")
\ No newline at end of file
+    print(f"Generated features: {features}")
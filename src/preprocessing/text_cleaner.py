@@ -1,55 +1,93 @@
 import re
 import string
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, List
 import logging
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from nltk.stem import WordNetLemmatizer
 import unicodedata
 
+NON_ALPHA_PATTERN = re.compile(r'[^a-zA-Z\s]')
+WORD_PATTERN = re.compile(r'[a-z]+')
+
+# Per-process cleaner used by batch_clean workers
+_worker_cleaner = None
+
+def _init_worker(tokenizer: str, lemma_cache_size: int):
+    global _worker_cleaner
+    _worker_cleaner = TextCleaner(tokenizer=tokenizer, lemma_cache_size=lemma_cache_size)
+
+def _clean_chunk(texts: List[str]) -> List[Optional[str]]:
+    return [_worker_cleaner.clean_text(text) for text in texts]
+
 class TextCleaner:
-    def __init__(self):
+    def __init__(self, tokenizer: str = "nltk", lemma_cache_size: int = 100000):
         self.logger = logging.getLogger(__name__)
-        self.stop_words = set(stopwords.words('english'))
+        if tokenizer not in ("nltk", "regex"):
+            raise ValueError(f"Unknown tokenizer: {tokenizer}")
+        self.tokenizer = tokenizer
+        self.lemma_cache_size = lemma_cache_size
+        self.stop_words = frozenset(stopwords.words('english'))
         self.lemmatizer = WordNetLemmatizer()
+        # Token frequencies are Zipfian, so a bounded memo catches most lookups
+        self._lemmatize = lru_cache(maxsize=lemma_cache_size)(self.lemmatizer.lemmatize)
         self.logger.info("Text cleaner initialized")
 
+    def _tokenize(self, text: str) -> List[str]:
+        if self.tokenizer == "regex":
+            return WORD_PATTERN.findall(text)
+        return word_tokenize(text)
+
     def clean_text(self, text: str) -> Optional[str]:
         """Clean and normalize text data"""
         try:
             # Convert to lowercase
             text = text.lower()
-            
+
             # Remove special characters and numbers
-            text = re.sub(r'[^a-zA-Z\s]', '', text)
-            
-            # Normalize unicode characters
-            text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('utf-8')
-            
+            text = NON_ALPHA_PATTERN.sub('', text)
+
+            # Normalize unicode characters; only non-ASCII whitespace can remain at this point
+            if not text.isascii():
+                text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('utf-8')
+
             # Tokenize and remove stopwords
-            tokens = word_tokenize(text)
-            filtered_tokens = [word for word in tokens if word not in self.stop_words]
-            
+            stop_words = self.stop_words
+            filtered_tokens = [word for word in self._tokenize(text) if word not in stop_words]
+
             # Lemmatize words
-            lemmatized_tokens = [self.lemmatizer.lemmatize(token) for token in filtered_tokens]
-            
+            lemmatize = self._lemmatize
+            lemmatized_tokens = [lemmatize(token) for token in filtered_tokens]
+
             # Join tokens back into string
             cleaned_text = ' '.join(lemmatized_tokens)
-            
+
             return cleaned_text
         except Exception as e:
             self.logger.error(f"Error cleaning text: {e}")
             return None
 
-    def batch_clean(self, texts: list) -> list:
-        """Clean a batch of text documents"""
-        return [self.clean_text(text) for text in texts if text is not None]
+    def batch_clean(self, texts: list, n_jobs: int = 1, chunk_size: int = 1000) -> list:
+        """Clean a batch of text documents, optionally across a process pool"""
+        texts = [text for text in texts if text is not None]
+        if n_jobs <= 1 or len(texts) <= chunk_size:
+            return [self.clean_text(text) for text in texts]
+
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=_init_worker,
+            initargs=(self.tokenizer, self.lemma_cache_size)
+        ) as pool:
+            return [cleaned for chunk in pool.map(_clean_chunk, chunks) for cleaned in chunk]
 
 if __name__ == "__main__":
     import sys
     logging.basicConfig(level=logging.INFO)
-    
+
     cleaner = TextCleaner()
     sample_text = "This is a sample text with numbers 123 and special characters !@#"
     cleaned_text = cleaner.clean_text(sample_text)
-    print(f"Cleaned text: {cleaned_text}")
\ No newline at end of file
+    print(f"Cleaned text: {cleaned_text}")
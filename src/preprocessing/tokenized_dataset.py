@@ -0,0 +1,252 @@
+import json
+import logging
+import os
+import random
+from typing import Dict, Any, List, Optional, Callable, Iterator
+import numpy as np
+import pandas as pd
+import torch
+from torch.utils.data import Dataset, DataLoader, Sampler
+from transformers import AutoTokenizer
+from src.preprocessing.text_cleaner import TextCleaner
+from src.preprocessing.truncation import encode_segments
+
+class DatasetCompiler:
+    """Cleans and tokenizes a labelled CSV once into memory-mappable arrays.
+
+    Each split is written as a flat ``input_ids.npy`` (int32) holding every
+    sequence back to back, ``offsets.npy`` marking where each sequence starts,
+    and ``labels.npy``. Sequences are sorted by token length so neighbouring
+    examples pad to similar lengths. Sequences are stored unpadded, so the
+    attention mask is all ones up to each sequence's length and is rebuilt on
+    read rather than stored.
+    """
+
+    def __init__(self,
+                 tokenizer_name: str = "bert-base-uncased",
+                 max_length: int = 512,
+                 clean_fn: Optional[Callable[[str], Optional[str]]] = None,
+                 truncation: str = "head"):
+        self.logger = logging.getLogger(__name__)
+        if truncation not in ("head", "head_tail"):
+            raise ValueError(f"Training data supports head or head_tail truncation, not {truncation}")
+        self.tokenizer_name = tokenizer_name
+        self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+        self.max_length = max_length
+        self.truncation = truncation
+        self.clean_fn = clean_fn or TextCleaner().clean_text
+        self.logger.info(f"Initialized DatasetCompiler with {tokenizer_name} (max_length={max_length}, truncation={truncation})")
+
+    def compile(self,
+                data_path: str,
+                output_dir: str,
+                label2id: Dict[str, int],
+                text_column: str = "text",
+                label_column: str = "category",
+                validation_split: float = 0.1,
+                chunksize: int = 10000,
+                seed: int = 42) -> Dict[str, Any]:
+        """Compile a CSV into train and validation splits under output_dir"""
+        try:
+            rng = random.Random(seed)
+            splits = {name: self._SplitWriter(os.path.join(output_dir, name)) for name in ("train", "validation")}
+
+            for chunk in pd.read_csv(data_path, chunksize=chunksize, usecols=[text_column, label_column]):
+                chunk = chunk[chunk[label_column].isin(label2id)]
+                texts = [self.clean_fn(text) or '' for text in chunk[text_column].fillna('').astype(str)]
+                labels = chunk[label_column].map(label2id).to_numpy(dtype=np.int64)
+                input_ids, _ = encode_segments(self.tokenizer, texts, max_length=self.max_length, strategy=self.truncation)
+                for ids, label in zip(input_ids, labels):
+                    name = "validation" if rng.random() < validation_split else "train"
+                    splits[name].add(ids, label)
+
+            meta = {
+                'tokenizer': self.tokenizer_name,
+                'max_length': self.max_length,
+                'truncation': self.truncation,
+                'pad_token_id': self.tokenizer.pad_token_id,
+                'label2id': label2id,
+                'source': os.path.abspath(data_path)
+            }
+            counts = {name: writer.finalize(meta) for name, writer in splits.items()}
+            self.logger.info(f"Compiled {data_path} into {output_dir}: {counts}")
+            return {**meta, 'counts': counts}
+        except Exception as e:
+            self.logger.error(f"Error compiling dataset: {e}")
+            raise
+
+    class _SplitWriter:
+        """Appends sequences to a scratch file, then writes them sorted by length"""
+
+        def __init__(self, path: str):
+            self.path = path
+            os.makedirs(path, exist_ok=True)
+            self._scratch_path = os.path.join(path, "input_ids.unsorted")
+            self._scratch = open(self._scratch_path, 'wb')
+            self.lengths: List[int] = []
+            self.labels: List[int] = []
+
+        def add(self, input_ids: List[int], label: int):
+            self._scratch.write(np.asarray(input_ids, dtype=np.int32).tobytes())
+            self.lengths.append(len(input_ids))
+            self.labels.append(int(label))
+
+        def finalize(self, meta: Dict[str, Any]) -> int:
+            self._scratch.close()
+            lengths = np.asarray(self.lengths, dtype=np.int64)
+            starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if len(lengths) else lengths
+            order = np.argsort(lengths, kind='stable')
+
+            unsorted = np.memmap(self._scratch_path, dtype=np.int32, mode='r') if lengths.sum() else np.zeros(0, np.int32)
+            input_ids = np.lib.format.open_memmap(
+                os.path.join(self.path, "input_ids.npy"), mode='w+', dtype=np.int32, shape=(int(lengths.sum()),)
+            )
+            offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+            np.cumsum(lengths[order], out=offsets[1:])
+            for position, i in enumerate(order):
+                input_ids[offsets[position]:offsets[position + 1]] = unsorted[starts[i]:starts[i] + lengths[i]]
+            input_ids.flush()
+            del input_ids, unsorted
+            os.remove(self._scratch_path)
+
+            np.save(os.path.join(self.path, "offsets.npy"), offsets)
+            np.save(os.path.join(self.path, "labels.npy"), np.asarray(self.labels, dtype=np.int64)[order])
+            with open(os.path.join(self.path, "meta.json"), 'w') as f:
+                json.dump({**meta, 'num_examples': len(lengths)}, f)
+            return len(lengths)
+
+class LengthBucketSampler(Sampler):
+    """Batch sampler that groups examples of similar length and shuffles the order of batches.
+
+    Examples are shuffled, split into pools of ``batch_size * bucket_multiplier``,
+    sorted by length within each pool and cut into batches, so every batch pads
+    to a similar length while epochs still see different batch compositions.
+    With ``num_replicas`` > 1 each rank takes every ``num_replicas``-th batch,
+    truncated so all ranks run the same number of steps.
+    """
+
+    def __init__(self,
+                 lengths: np.ndarray,
+                 batch_size: int,
+                 shuffle: bool = True,
+                 bucket_multiplier: int = 50,
+                 seed: int = 42,
+                 num_replicas: int = 1,
+                 rank: int = 0):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.bucket_size = batch_size * bucket_multiplier
+        self.seed = seed
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int):
+        self.epoch = epoch
+
+    def __len__(self) -> int:
+        return ((len(self.lengths) + self.batch_size - 1) // self.batch_size) // self.num_replicas
+
+    def __iter__(self) -> Iterator[List[int]]:
+        rng = np.random.default_rng(self.seed + self.epoch)
+        self.epoch += 1
+        indices = rng.permutation(len(self.lengths)) if self.shuffle else np.arange(len(self.lengths))
+
+        batches = []
+        for start in range(0, len(indices), self.bucket_size):
+            pool = indices[start:start + self.bucket_size]
+            pool = pool[np.argsort(self.lengths[pool], kind='stable')]
+            batches.extend(pool[i:i + self.batch_size].tolist() for i in range(0, len(pool), self.batch_size))
+        if self.shuffle:
+            rng.shuffle(batches)
+        if self.num_replicas > 1:
+            batches = batches[self.rank:len(self) * self.num_replicas:self.num_replicas]
+        return iter(batches)
+
+class TokenizedDataset(Dataset):
+    """Reads a compiled split through memory maps, without copying token ids"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), 'r') as f:
+            self.meta = json.load(f)
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))
+        self.labels = np.load(os.path.join(path, "labels.npy"))
+        self.pad_token_id = self.meta['pad_token_id']
+        self._input_ids = None
+
+    @property
+    def input_ids(self) -> np.ndarray:
+        # Opened lazily so DataLoader workers each map the file instead of pickling it
+        if self._input_ids is None:
+            self._input_ids = np.load(os.path.join(self.path, "input_ids.npy"), mmap_mode='c')
+        return self._input_ids
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_input_ids'] = None
+        return state
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        input_ids = torch.from_numpy(self.input_ids[start:end])
+        return {
+            'input_ids': input_ids,
+            'attention_mask': torch.ones_like(input_ids),
+            'labels': torch.tensor(self.labels[idx])
+        }
+
+    def collate(self, batch: List[Dict[str, torch.Tensor]]) -> Dict[str, torch.Tensor]:
+        """Pad a list of examples to the longest one in the batch"""
+        max_length = max(len(item['input_ids']) for item in batch)
+        input_ids = torch.full((len(batch), max_length), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(batch), max_length), dtype=torch.long)
+        for row, item in enumerate(batch):
+            length = len(item['input_ids'])
+            input_ids[row, :length] = item['input_ids']
+            attention_mask[row, :length] = 1
+        return {
+            'input_ids': input_ids,
+            'attention_mask': attention_mask,
+            'labels': torch.stack([item['labels'] for item in batch])
+        }
+
+    def loader(self, batch_size: int = 32, shuffle: bool = False, num_workers: int = 0, bucket_by_length: bool = True, **kwargs) -> DataLoader:
+        """DataLoader that pads each batch with collate(), grouping similar lengths when bucket_by_length is set"""
+        if bucket_by_length:
+            return DataLoader(
+                self,
+                batch_sampler=LengthBucketSampler(self.lengths(), batch_size, shuffle=shuffle),
+                num_workers=num_workers,
+                collate_fn=self.collate,
+                persistent_workers=num_workers > 0,
+                **kwargs
+            )
+        return DataLoader(
+            self,
+            batch_size=batch_size,
+            shuffle=shuffle,
+            num_workers=num_workers,
+            collate_fn=self.collate,
+            persistent_workers=num_workers > 0,
+            **kwargs
+        )
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    compiler = DatasetCompiler()
+    compiler.compile(
+        "data/processed/training_data.csv",
+        "data/processed/training_sets/example",
+        label2id={"category_a": 0, "category_b": 1}
+    )
+    dataset = TokenizedDataset("data/processed/training_sets/example/train")
+    print(f"Loaded {len(dataset)} examples, first batch: {next(iter(dataset.loader(batch_size=4)))}")
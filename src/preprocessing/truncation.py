@@ -0,0 +1,70 @@
+from typing import List, Optional, Tuple
+
+TRUNCATION_STRATEGIES = ("head", "head_tail", "sliding_window")
+
+def segment_tokens(token_ids: List[int],
+                   budget: int,
+                   strategy: str = "head",
+                   head_fraction: float = 0.25,
+                   stride: Optional[int] = None) -> List[List[int]]:
+    """Fit token ids (without special tokens) into segments of at most budget tokens.
+
+    ``head`` keeps the start of the text; ``head_tail`` keeps the first
+    ``head_fraction`` of the budget and fills the rest from the end of the
+    text, where long documents often carry their conclusion; ``sliding_window``
+    covers the whole text with windows that advance by ``stride`` tokens
+    (half the budget by default).
+    """
+    if len(token_ids) <= budget:
+        return [token_ids]
+    if strategy == "head":
+        return [token_ids[:budget]]
+    if strategy == "head_tail":
+        head = int(budget * head_fraction)
+        return [token_ids[:head] + token_ids[len(token_ids) - (budget - head):]]
+    if strategy == "sliding_window":
+        stride = stride or max(1, budget // 2)
+        segments = []
+        for start in range(0, len(token_ids), stride):
+            segments.append(token_ids[start:start + budget])
+            if start + budget >= len(token_ids):
+                break
+        return segments
+    raise ValueError(f"Unknown truncation strategy: {strategy} (expected one of {TRUNCATION_STRATEGIES})")
+
+def special_token_template(tokenizer) -> Tuple[List[int], List[int]]:
+    """Special token ids the tokenizer puts before and after a single sequence"""
+    encoding = tokenizer("a", return_special_tokens_mask=True)
+    mask = encoding['special_tokens_mask']
+    content = [i for i, special in enumerate(mask) if not special]
+    return encoding['input_ids'][:content[0]], encoding['input_ids'][content[-1] + 1:]
+
+def encode_segments(tokenizer,
+                    texts: List[str],
+                    max_length: int = 512,
+                    strategy: str = "head",
+                    head_fraction: float = 0.25,
+                    stride: Optional[int] = None) -> Tuple[List[List[int]], List[int]]:
+    """Tokenize texts into model-ready segments with special tokens.
+
+    Returns the segments and, for each segment, the index of the text it came
+    from; every text yields exactly one segment except under ``sliding_window``.
+    """
+    if strategy == "head":
+        # The tokenizer truncates natively, without materialising the full token list
+        input_ids = tokenizer(texts, max_length=max_length, truncation=True)['input_ids']
+        return input_ids, list(range(len(texts)))
+
+    prefix, suffix = special_token_template(tokenizer)
+    budget = max_length - len(prefix) - len(suffix)
+    segments, owners = [], []
+    for i, token_ids in enumerate(tokenizer(texts, add_special_tokens=False, truncation=False)['input_ids']):
+        for segment in segment_tokens(token_ids, budget, strategy, head_fraction, stride):
+            segments.append(prefix + segment + suffix)
+            owners.append(i)
+    return segments, owners
+
+if __name__ == "__main__":
+    tokens = list(range(20))
+    for strategy in TRUNCATION_STRATEGIES:
+        print(f"{strategy}: {segment_tokens(tokens, 8, strategy)}")